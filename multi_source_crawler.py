@@ -4,16 +4,31 @@ Crawl tin tức từ nhiều nguồn để đảm bảo đủ dữ liệu cho 5
 Sources: VnExpress, Dân Trí, CafeF
 """
 
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import httpx
+import hishel
+from hishel.httpx import AsyncCacheTransport
+from requests_cache import CachedSession, DO_NOT_CACHE
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from bs4 import BeautifulSoup, SoupStrainer
+from selectolax.lexbor import LexborHTMLParser
+from pybloom_live import ScalableBloomFilter
+import xxhash
+import ahocorasick
+import itertools
+import pyarrow as pa
+import pyarrow.csv as pacsv
 import csv
 from datetime import datetime, timedelta
 import time
 import sys
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
+from threading import Condition, Lock, Thread, local
+import queue
+from urllib.parse import urljoin, urlsplit
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 # ============= CONFIGURATION =============
 TICKERS = ["BID", "FPT"]
@@ -21,28 +36,151 @@ START_DATE = datetime(2015, 1, 1)  # Full range 2015-2025
 END_DATE = datetime(2025, 10, 30)
 
 MAX_WORKERS = 5
+PARSE_WORKERS = os.cpu_count() or 1  # Processes for HTML parsing (the event loop only does I/O)
 BATCH_SIZE = 100
 MAX_RETRIES = 3
-REQUEST_DELAY = 0.2
+REQUESTS_PER_SECOND = 15  # Token-bucket budget per host (listing + article requests)
 
-# Thread-safe
-csv_lock = Lock()
-seen_urls = set()
+HEADERS = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
+
+# Search pages: only build the nodes that carry article links
+# (strainers see the raw class attribute, so match one class among several)
+VNEXPRESS_LISTING_STRAINER = SoupStrainer('h3', class_=re.compile(r'(?:^|\s)title-news(?:\s|$)'))
+CAFEF_LISTING_STRAINER = SoupStrainer('a', href=re.compile(r'\.chn'))
+
+# On-disk response cache: article pages are re-read from SQLite on later runs.
+# Search listings are never cached since they change between runs.
+RESPONSE_CACHE_PATH = "crawl_cache.sqlite"
+SYNC_RESPONSE_CACHE_PATH = "crawl_cache_sync.sqlite"  # requests-cache (blocking crawlers)
+RESPONSE_CACHE_TTL = timedelta(days=30).total_seconds()
+LISTING_URL_MARKERS = ("timkiem.", "/tim-kiem")
+
+class ArticlePageFilter(hishel.BaseFilter):
+    def needs_body(self):
+        return False
+    
+    def apply(self, item, body):
+        url = str(item.url)
+        return not any(marker in url for marker in LISTING_URL_MARKERS)
+
+class OkResponseFilter(hishel.BaseFilter):
+    def needs_body(self):
+        return False
+    
+    def apply(self, item, body):
+        return item.status_code == 200
+
+def create_cache_transport(next_transport):
+    """Wrap an httpx transport with the SQLite article cache"""
+    return AsyncCacheTransport(
+        next_transport=next_transport,
+        storage=hishel.AsyncSqliteStorage(database_path=RESPONSE_CACHE_PATH, default_ttl=RESPONSE_CACHE_TTL),
+        policy=hishel.FilterPolicy(request_filters=[ArticlePageFilter()], response_filters=[OkResponseFilter()])
+    )
+
+# Not thread-safe: only checked/updated from the event-loop thread (process_article)
+seen_urls = ScalableBloomFilter(initial_capacity=1_000_000, error_rate=1e-6)  # ~4 bytes per URL instead of the full string
+# One sync session per worker thread
+_thread_local = local()
+
+def get_session():
+    """Per-thread cached session: keep-alive connection pool + retry on 5xx + SQLite article cache"""
+    session = getattr(_thread_local, 'session', None)
+    if session is None:
+        session = CachedSession(
+            SYNC_RESPONSE_CACHE_PATH, backend='sqlite',
+            expire_after=timedelta(days=30), allowable_codes=[200], stale_if_error=True,
+            urls_expire_after={f'*{marker}*': DO_NOT_CACHE for marker in LISTING_URL_MARKERS}
+        )
+        session.headers.update(HEADERS)
+        adapter = HTTPAdapter(
+            pool_connections=MAX_WORKERS,
+            pool_maxsize=MAX_WORKERS * 2,
+            max_retries=Retry(total=MAX_RETRIES, backoff_factor=0.5,
+                              status_forcelist=[500, 502, 503, 504], raise_on_status=False)
+        )
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _thread_local.session = session
+    return session
+
+class RateLimiter:
+    """Async token bucket: refills `rate` tokens/s, bursts up to `rate` requests"""
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+class ThreadRateLimiter:
+    """Blocking token bucket shared by worker threads (same refill rule as RateLimiter)"""
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.cond = Condition()
+    
+    def acquire(self):
+        with self.cond:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                self.cond.wait((1 - self.tokens) / self.rate)
+
+_host_limiters = {}
+_host_limiters_lock = Lock()
+
+def http_get(url, timeout=10):
+    """Blocking GET via the per-thread session, throttled by the host's token bucket"""
+    host = urlsplit(url).netloc
+    with _host_limiters_lock:
+        limiter = _host_limiters.get(host)
+        if limiter is None:
+            limiter = _host_limiters[host] = ThreadRateLimiter(REQUESTS_PER_SECOND)
+    limiter.acquire()
+    return get_session().get(url, timeout=timeout)
+
+MAX_CONTENT_CHARS = 20000  # Stop collecting paragraphs once an article is this long
+
+def join_paragraphs(paragraphs):
+    """Join paragraph texts longer than 20 chars, stopping after MAX_CONTENT_CHARS"""
+    parts = []
+    total_len = 0
+    for p in paragraphs:
+        text = p.text(strip=True)
+        if len(text) > 20:
+            parts.append(text)
+            total_len += len(text) + 1
+            if total_len > MAX_CONTENT_CHARS:
+                break
+    return " ".join(parts)
 
 # ============= VNEXPRESS CRAWLER =============
+# Search results link to articles on the main site; urljoin resolves relative and // hrefs
+VNEXPRESS_ARTICLE_PREFIX = "https://vnexpress.net/"
+
 class VnExpressCrawler:
     BASE_URL = "https://vnexpress.net"
     SEARCH_URL = "https://timkiem.vnexpress.net/?q={query}&date_from={date_from}&date_to={date_to}&media_type=all&page={page}"
     
     @staticmethod
-    def get_article_links(ticker, year, max_pages=50):
-        """Crawl article links từ VnExpress theo ticker và năm - NHIỀU QUERIES"""
-        links = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-        
-        year_start = datetime(year, 1, 1)
-        year_end = datetime(year, 12, 31) if year < END_DATE.year else END_DATE
-        
+    def search_queries(ticker):
+        """Queries TẬP TRUNG VÀO TÀI CHÍNH cho một ticker"""
         # Tên đầy đủ của các ngân hàng
         ticker_names = {
             "ACB": ["ACB", "Á Châu", "ngân hàng ACB", "Asia Commercial Bank"],
@@ -52,7 +190,6 @@ class VnExpressCrawler:
             "FPT": ["FPT", "FPT Corporation", "Tập đoàn FPT", "cổ phiếu FPT"],
         }
         
-        # Tạo queries TẬP TRUNG VÀO TÀI CHÍNH
         base_queries = ticker_names.get(ticker, [ticker])
         queries = []
         for name in base_queries:
@@ -64,84 +201,80 @@ class VnExpressCrawler:
                 f"{name} doanh thu",
                 f"{name} báo cáo quý",
             ])
+        return queries
+    
+    @staticmethod
+    def listing_url(query, year, page):
+        """Search page URL for one query, limited to the given year"""
+        year_start = datetime(year, 1, 1)
+        year_end = datetime(year, 12, 31) if year < END_DATE.year else END_DATE
+        return VnExpressCrawler.SEARCH_URL.format(
+            query=query.replace(' ', '+'),
+            date_from=year_start.strftime("%Y-%m-%d"),
+            date_to=year_end.strftime("%Y-%m-%d"),
+            page=page
+        )
+    
+    @staticmethod
+    def parse_listing(html):
+        """Parse one search page -> (has_results, links)"""
+        soup = BeautifulSoup(html, "lxml", parse_only=VNEXPRESS_LISTING_STRAINER)
+        articles = soup.find_all('h3', class_='title-news')
         
-        for query in queries:
-            consecutive_empty = 0
-            for page in range(1, max_pages + 1):
-                if consecutive_empty >= 2:
-                    break
-                
-                url = VnExpressCrawler.SEARCH_URL.format(
-                    query=query.replace(' ', '+'),
-                    date_from=year_start.strftime("%Y-%m-%d"),
-                    date_to=year_end.strftime("%Y-%m-%d"),
-                    page=page
-                )
-                
-                try:
-                    resp = requests.get(url, headers=headers, timeout=10)
-                    if resp.status_code != 200:
-                        consecutive_empty += 1
-                        continue
-                    
-                    soup = BeautifulSoup(resp.text, "html.parser")
-                    articles = soup.find_all('h3', class_='title-news')
-                    
-                    if not articles:
-                        consecutive_empty += 1
-                        continue
-                    
-                    for article in articles:
-                        a_tag = article.find('a', href=True)
-                        if a_tag:
-                            href = a_tag.get('href', '')
-                            if href.startswith('http'):
-                                links.append(('vnexpress', href))
-                            elif href.startswith('/'):
-                                links.append(('vnexpress', VnExpressCrawler.BASE_URL + href))
-                    
-                    consecutive_empty = 0
-                    time.sleep(REQUEST_DELAY)
-                    
-                except Exception as e:
-                    consecutive_empty += 1
-                    time.sleep(0.5)
+        a_tags = (article.find('a', href=True) for article in articles)
+        urls = [urljoin(VNEXPRESS_ARTICLE_PREFIX, a_tag.get('href', '')) for a_tag in a_tags if a_tag]
+        links = [('vnexpress', url) for url in urls if url.startswith(VNEXPRESS_ARTICLE_PREFIX)]
         
-        return links
+        return bool(articles), links
+    
+    @staticmethod
+    async def get_article_links(client, semaphore, limiter, ticker, year, max_pages=50):
+        """Crawl article links từ VnExpress theo ticker và năm - NHIỀU QUERIES (chạy song song)"""
+        results = await asyncio.gather(*(
+            crawl_search_pages(
+                client, semaphore, limiter,
+                lambda page, query=query: VnExpressCrawler.listing_url(query, year, page),
+                VnExpressCrawler.parse_listing,
+                max_pages, max_empty=2
+            )
+            for query in VnExpressCrawler.search_queries(ticker)
+        ))
+        return [link for links in results for link in links]
+    
+    @staticmethod
+    def parse_content(html):
+        """Extract title, content, date từ HTML bài VnExpress"""
+        tree = LexborHTMLParser(html)
+        
+        # Title
+        title = ""
+        title_elem = tree.css_first("h1.title-detail")
+        if title_elem:
+            title = title_elem.text(strip=True)
+        
+        # Content
+        content = ""
+        content_elem = tree.css_first("article.fck_detail")
+        if content_elem:
+            content = join_paragraphs(content_elem.css("p.Normal"))
+        
+        # Date
+        date_str = ""
+        date_elem = tree.css_first("span.date")
+        if date_elem:
+            date_str = date_elem.text(strip=True)
+        
+        return title, content, date_str
     
     @staticmethod
     def extract_content(url):
         """Extract title, content, date từ VnExpress article"""
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-        
         try:
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = http_get(url)
             if resp.status_code != 200:
                 return None, None, None
             
-            soup = BeautifulSoup(resp.text, "html.parser")
-            
-            # Title
-            title = ""
-            title_elem = soup.select_one("h1.title-detail")
-            if title_elem:
-                title = title_elem.get_text(strip=True)
-            
-            # Content
-            content = ""
-            content_elem = soup.select_one("article.fck_detail")
-            if content_elem:
-                paragraphs = content_elem.select("p.Normal")
-                if paragraphs:
-                    content = " ".join([p.get_text(strip=True) for p in paragraphs if len(p.get_text(strip=True)) > 20])
-            
-            # Date
-            date_str = ""
-            date_elem = soup.select_one("span.date")
-            if date_elem:
-                date_str = date_elem.get_text(strip=True)
-            
-            return title, content, date_str
+            return VnExpressCrawler.parse_content(resp.content)
             
         except Exception as e:
             return None, None, None
@@ -155,7 +288,6 @@ class DanTriCrawler:
     def get_article_links(ticker, year, max_pages=50):
         """Crawl article links từ Dân Trí - NHIỀU QUERIES"""
         links = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
         
         ticker_names = {
             "ACB": ["ACB", "Á Châu", "Asia Commercial Bank"],
@@ -185,12 +317,12 @@ class DanTriCrawler:
                 url = DanTriCrawler.SEARCH_URL.format(query=query.replace(' ', '+'), page=page)
                 
                 try:
-                    resp = requests.get(url, headers=headers, timeout=10)
+                    resp = http_get(url)
                     if resp.status_code != 200:
                         consecutive_empty += 1
                         continue
                     
-                    soup = BeautifulSoup(resp.text, "html.parser")
+                    soup = BeautifulSoup(resp.text, "lxml")
                     
                     # Dân Trí search results
                     articles = soup.select("h3.article-title a, h4.article-title a")
@@ -216,8 +348,6 @@ class DanTriCrawler:
                     else:
                         consecutive_empty = 0
                     
-                    time.sleep(REQUEST_DELAY)
-                    
                 except Exception as e:
                     consecutive_empty += 1
                     time.sleep(0.5)
@@ -227,14 +357,12 @@ class DanTriCrawler:
     @staticmethod
     def extract_content(url):
         """Extract content từ Dân Trí article"""
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-        
         try:
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = http_get(url)
             if resp.status_code != 200:
                 return None, None, None
             
-            soup = BeautifulSoup(resp.text, "html.parser")
+            soup = BeautifulSoup(resp.text, "lxml")
             
             # Title
             title = ""
@@ -270,7 +398,6 @@ class ThanhNienCrawler:
     def get_article_links(ticker, year, max_pages=30):
         """Crawl từ ThanhNien.vn"""
         links = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
         
         ticker_names = {
             "ACB": ["ACB", "ngân hàng ACB"],
@@ -294,12 +421,12 @@ class ThanhNienCrawler:
                 )
                 
                 try:
-                    resp = requests.get(url, headers=headers, timeout=10)
+                    resp = http_get(url)
                     if resp.status_code != 200:
                         consecutive_empty += 1
                         continue
                     
-                    soup = BeautifulSoup(resp.text, "html.parser")
+                    soup = BeautifulSoup(resp.text, "lxml")
                     
                     # ThanhNien search results
                     articles = soup.select("h2.title-news a, h3.title-news a")
@@ -325,8 +452,6 @@ class ThanhNienCrawler:
                     else:
                         consecutive_empty = 0
                     
-                    time.sleep(REQUEST_DELAY)
-                    
                 except Exception as e:
                     consecutive_empty += 1
                     time.sleep(0.5)
@@ -336,14 +461,12 @@ class ThanhNienCrawler:
     @staticmethod
     def extract_content(url):
         """Extract content từ ThanhNien article"""
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-        
         try:
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = http_get(url)
             if resp.status_code != 200:
                 return None, None, None
             
-            soup = BeautifulSoup(resp.text, "html.parser")
+            soup = BeautifulSoup(resp.text, "lxml")
             
             # Title
             title = ""
@@ -376,11 +499,27 @@ class CafeFCrawler:
     SEARCH_URL = "https://cafef.vn/tim-kiem.chn?keywords={query}&page={page}"
     
     @staticmethod
-    def get_article_links(ticker, year, max_pages=20):
-        """Crawl từ CafeF - FINANCIAL FOCUSED"""
+    def parse_listing(html, ticker, year):
+        """Parse one search page -> (found_articles, links) for ticker/year"""
+        soup = BeautifulSoup(html, "lxml", parse_only=CAFEF_LISTING_STRAINER)
+        all_links = soup.find_all('a', href=True)
+        
         links = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
+        for a in all_links:
+            href = a.get('href', '')
+            text = a.get_text(strip=True).lower()
+            
+            # Check if link contains news article pattern and mentions ticker
+            if '.chn' in href and (ticker.lower() in text or ticker.lower() in href.lower()):
+                # Check if from correct year
+                if str(year) in href or f'{year % 100:02d}' in href:
+                    links.append(('cafef', urljoin(CafeFCrawler.BASE_URL, href)))
         
+        return bool(links), links
+    
+    @staticmethod
+    async def get_article_links(client, semaphore, limiter, ticker, year, max_pages=20):
+        """Crawl từ CafeF - FINANCIAL FOCUSED"""
         # Financial-focused queries
         queries = [
             f"{ticker} báo cáo tài chính",
@@ -389,49 +528,16 @@ class CafeFCrawler:
             ticker  # Fallback to ticker only
         ]
         
-        for query in queries:
-            consecutive_empty = 0
-            for page in range(1, max_pages + 1):
-                if consecutive_empty >= 3:
-                    break
-                
-                url = CafeFCrawler.SEARCH_URL.format(query=query, page=page)
-            
-            try:
-                resp = requests.get(url, headers=headers, timeout=10)
-                if resp.status_code != 200:
-                    consecutive_empty += 1
-                    continue
-                
-                soup = BeautifulSoup(resp.text, "html.parser")
-                all_links = soup.find_all('a', href=True)
-                
-                found_articles = False
-                for a in all_links:
-                    href = a.get('href', '')
-                    text = a.get_text(strip=True).lower()
-                    
-                    # Check if link contains news article pattern and mentions ticker
-                    if '.chn' in href and (ticker.lower() in text or ticker.lower() in href.lower()):
-                        # Check if from correct year
-                        if str(year) in href or f'{year % 100:02d}' in href:
-                            found_articles = True
-                            if not href.startswith('http'):
-                                href = CafeFCrawler.BASE_URL + href
-                            links.append(('cafef', href))
-                
-                if not found_articles:
-                    consecutive_empty += 1
-                else:
-                    consecutive_empty = 0
-                
-                time.sleep(REQUEST_DELAY)
-                
-            except Exception as e:
-                consecutive_empty += 1
-                time.sleep(0.5)
-        
-        return links
+        results = await asyncio.gather(*(
+            crawl_search_pages(
+                client, semaphore, limiter,
+                lambda page, query=query: CafeFCrawler.SEARCH_URL.format(query=query, page=page),
+                lambda html: CafeFCrawler.parse_listing(html, ticker, year),
+                max_pages, max_empty=3
+            )
+            for query in queries
+        ))
+        return [link for links in results for link in links]
 
 # ============= VIETSTOCK CRAWLER =============
 class VietstockCrawler:
@@ -442,7 +548,6 @@ class VietstockCrawler:
     def get_article_links(ticker, year, max_pages=30):
         """Crawl từ Vietstock.vn"""
         links = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
         
         ticker_names = {
             "ACB": ["ACB", "Á Châu"],
@@ -466,12 +571,12 @@ class VietstockCrawler:
                 )
                 
                 try:
-                    resp = requests.get(url, headers=headers, timeout=10)
+                    resp = http_get(url)
                     if resp.status_code != 200:
                         consecutive_empty += 1
                         continue
                     
-                    soup = BeautifulSoup(resp.text, "html.parser")
+                    soup = BeautifulSoup(resp.text, "lxml")
                     articles = soup.select("h3 a, h2.news-title a, div.news-item a")
                     
                     if not articles:
@@ -494,8 +599,6 @@ class VietstockCrawler:
                     else:
                         consecutive_empty = 0
                     
-                    time.sleep(REQUEST_DELAY)
-                    
                 except Exception as e:
                     consecutive_empty += 1
                     time.sleep(0.5)
@@ -505,14 +608,12 @@ class VietstockCrawler:
     @staticmethod
     def extract_content(url):
         """Extract content từ Vietstock article"""
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-        
         try:
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = http_get(url)
             if resp.status_code != 200:
                 return None, None, None
             
-            soup = BeautifulSoup(resp.text, "html.parser")
+            soup = BeautifulSoup(resp.text, "lxml")
             
             title = ""
             title_elem = soup.select_one("h1.news-title, h1.detail-title")
@@ -545,7 +646,6 @@ class StockbizCrawler:
     def get_article_links(ticker, year, max_pages=30):
         """Crawl từ Stockbiz.vn"""
         links = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
         
         ticker_names = {
             "ACB": ["ACB", "ngân hàng ACB"],
@@ -569,12 +669,12 @@ class StockbizCrawler:
                 )
                 
                 try:
-                    resp = requests.get(url, headers=headers, timeout=10)
+                    resp = http_get(url)
                     if resp.status_code != 200:
                         consecutive_empty += 1
                         continue
                     
-                    soup = BeautifulSoup(resp.text, "html.parser")
+                    soup = BeautifulSoup(resp.text, "lxml")
                     articles = soup.select("h3 a, h2 a, div.article-item a")
                     
                     if not articles:
@@ -597,8 +697,6 @@ class StockbizCrawler:
                     else:
                         consecutive_empty = 0
                     
-                    time.sleep(REQUEST_DELAY)
-                    
                 except Exception as e:
                     consecutive_empty += 1
                     time.sleep(0.5)
@@ -608,14 +706,12 @@ class StockbizCrawler:
     @staticmethod
     def extract_content(url):
         """Extract content từ Stockbiz article"""
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-        
         try:
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = http_get(url)
             if resp.status_code != 200:
                 return None, None, None
             
-            soup = BeautifulSoup(resp.text, "html.parser")
+            soup = BeautifulSoup(resp.text, "lxml")
             
             title = ""
             title_elem = soup.select_one("h1.title, h1")
@@ -648,7 +744,6 @@ class NDHCrawler:
     def get_article_links(ticker, year, max_pages=30):
         """Crawl từ ndh.vn"""
         links = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
         
         queries = [ticker]
         
@@ -664,12 +759,12 @@ class NDHCrawler:
                 )
                 
                 try:
-                    resp = requests.get(url, headers=headers, timeout=10)
+                    resp = http_get(url)
                     if resp.status_code != 200:
                         consecutive_empty += 1
                         continue
                     
-                    soup = BeautifulSoup(resp.text, "html.parser")
+                    soup = BeautifulSoup(resp.text, "lxml")
                     articles = soup.select("h3 a, h2 a, div.news-item a")
                     
                     if not articles:
@@ -692,8 +787,6 @@ class NDHCrawler:
                     else:
                         consecutive_empty = 0
                     
-                    time.sleep(REQUEST_DELAY)
-                    
                 except Exception as e:
                     consecutive_empty += 1
                     time.sleep(0.5)
@@ -703,14 +796,12 @@ class NDHCrawler:
     @staticmethod
     def extract_content(url):
         """Extract content từ NDH article"""
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-        
         try:
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = http_get(url)
             if resp.status_code != 200:
                 return None, None, None
             
-            soup = BeautifulSoup(resp.text, "html.parser")
+            soup = BeautifulSoup(resp.text, "lxml")
             
             title = ""
             title_elem = soup.select_one("h1.title, h1")
@@ -743,7 +834,6 @@ class TinnhanhchungkhoanCrawler:
     def get_article_links(ticker, year, max_pages=30):
         """Crawl từ Tinnhanhchungkhoan.vn"""
         links = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
         
         queries = [ticker]
         
@@ -759,12 +849,12 @@ class TinnhanhchungkhoanCrawler:
                 )
                 
                 try:
-                    resp = requests.get(url, headers=headers, timeout=10)
+                    resp = http_get(url)
                     if resp.status_code != 200:
                         consecutive_empty += 1
                         continue
                     
-                    soup = BeautifulSoup(resp.text, "html.parser")
+                    soup = BeautifulSoup(resp.text, "lxml")
                     articles = soup.select("h3 a, h2.title a, div.article a")
                     
                     if not articles:
@@ -787,8 +877,6 @@ class TinnhanhchungkhoanCrawler:
                     else:
                         consecutive_empty = 0
                     
-                    time.sleep(REQUEST_DELAY)
-                    
                 except Exception as e:
                     consecutive_empty += 1
                     time.sleep(0.5)
@@ -798,14 +886,12 @@ class TinnhanhchungkhoanCrawler:
     @staticmethod
     def extract_content(url):
         """Extract content từ Tinnhanhchungkhoan article"""
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-        
         try:
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = http_get(url)
             if resp.status_code != 200:
                 return None, None, None
             
-            soup = BeautifulSoup(resp.text, "html.parser")
+            soup = BeautifulSoup(resp.text, "lxml")
             
             title = ""
             title_elem = soup.select_one("h1.title, h1")
@@ -838,7 +924,6 @@ class BaodautuCrawler:
     def get_article_links(ticker, year, max_pages=30):
         """Crawl từ baodautu.vn"""
         links = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
         
         ticker_names = {
             "ACB": ["ACB", "Á Châu"],
@@ -862,12 +947,12 @@ class BaodautuCrawler:
                 )
                 
                 try:
-                    resp = requests.get(url, headers=headers, timeout=10)
+                    resp = http_get(url)
                     if resp.status_code != 200:
                         consecutive_empty += 1
                         continue
                     
-                    soup = BeautifulSoup(resp.text, "html.parser")
+                    soup = BeautifulSoup(resp.text, "lxml")
                     articles = soup.select("h3 a, h2.title a, div.news-item a")
                     
                     if not articles:
@@ -890,8 +975,6 @@ class BaodautuCrawler:
                     else:
                         consecutive_empty = 0
                     
-                    time.sleep(REQUEST_DELAY)
-                    
                 except Exception as e:
                     consecutive_empty += 1
                     time.sleep(0.5)
@@ -901,14 +984,12 @@ class BaodautuCrawler:
     @staticmethod
     def extract_content(url):
         """Extract content từ Baodautu article"""
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-        
         try:
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = http_get(url)
             if resp.status_code != 200:
                 return None, None, None
             
-            soup = BeautifulSoup(resp.text, "html.parser")
+            soup = BeautifulSoup(resp.text, "lxml")
             
             title = ""
             title_elem = soup.select_one("h1.title, h1")
@@ -941,7 +1022,6 @@ class VietFinanceCrawler:
     def get_article_links(ticker, year, max_pages=30):
         """Crawl từ VietFinance.vn"""
         links = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
         
         queries = [ticker]
         
@@ -957,12 +1037,12 @@ class VietFinanceCrawler:
                 )
                 
                 try:
-                    resp = requests.get(url, headers=headers, timeout=10)
+                    resp = http_get(url)
                     if resp.status_code != 200:
                         consecutive_empty += 1
                         continue
                     
-                    soup = BeautifulSoup(resp.text, "html.parser")
+                    soup = BeautifulSoup(resp.text, "lxml")
                     articles = soup.select("h3 a, h2 a, div.article a")
                     
                     if not articles:
@@ -985,8 +1065,6 @@ class VietFinanceCrawler:
                     else:
                         consecutive_empty = 0
                     
-                    time.sleep(REQUEST_DELAY)
-                    
                 except Exception as e:
                     consecutive_empty += 1
                     time.sleep(0.5)
@@ -996,14 +1074,12 @@ class VietFinanceCrawler:
     @staticmethod
     def extract_content(url):
         """Extract content từ VietFinance article"""
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-        
         try:
-            resp = requests.get(url, headers=headers, timeout=10)
+            resp = http_get(url)
             if resp.status_code != 200:
                 return None, None, None
             
-            soup = BeautifulSoup(resp.text, "html.parser")
+            soup = BeautifulSoup(resp.text, "lxml")
             
             title = ""
             title_elem = soup.select_one("h1.title, h1")
@@ -1028,26 +1104,55 @@ class VietFinanceCrawler:
             return None, None, None
 
 # ============= MAIN CRAWLER =============
+DATE_FORMATS = (
+    "%d/%m/%Y, %H:%M",
+    "%d/%m/%Y %H:%M",
+    "%Y-%m-%d %H:%M:%S",
+    "%d/%m/%Y",
+    "%d-%m-%Y",
+)
+_strptime = datetime.strptime
+# One pass over every DATE_FORMATS shape: d/m/Y[[,] H:M], d-m-Y, Y-m-d H:M:S
+FAST_DATE_RE = re.compile(
+    r'(\d{1,2})/(\d{1,2})/(\d{4})(?:,? (\d{1,2}):(\d{1,2}))?'
+    r'|(\d{1,2})-(\d{1,2})-(\d{4})'
+    r'|(\d{4})-(\d{1,2})-(\d{1,2}) (\d{1,2}):(\d{1,2}):(\d{1,2})'
+)
+
+def _fast_parse_date(date_str):
+    """Build the datetime straight from regex groups, None if no shape fits"""
+    m = FAST_DATE_RE.fullmatch(date_str)
+    if not m:
+        return None
+    
+    g = m.groups()
+    try:
+        if g[0] is not None:
+            return datetime(int(g[2]), int(g[1]), int(g[0]),
+                            int(g[3] or 0), int(g[4] or 0))
+        if g[5] is not None:
+            return datetime(int(g[7]), int(g[6]), int(g[5]))
+        return datetime(int(g[8]), int(g[9]), int(g[10]),
+                        int(g[11]), int(g[12]), int(g[13]))
+    except ValueError:
+        return None
+
 def parse_date(date_str):
     """Parse date to ISO format"""
     if not date_str:
         return ""
     
-    date_str = re.sub(r'\s+', ' ', date_str.strip())
+    date_str = ' '.join(date_str.split())
     
-    formats = [
-        "%d/%m/%Y, %H:%M",
-        "%d/%m/%Y %H:%M",
-        "%Y-%m-%d %H:%M:%S",
-        "%d/%m/%Y",
-        "%d-%m-%Y",
-    ]
+    dt = _fast_parse_date(date_str)
+    if dt is not None:
+        return dt.strftime("%Y-%m-%d %H:%M:%S")
     
-    for fmt in formats:
+    for fmt in DATE_FORMATS:
         try:
-            dt = datetime.strptime(date_str, fmt)
+            dt = _strptime(date_str, fmt)
             return dt.strftime("%Y-%m-%d %H:%M:%S")
-        except:
+        except ValueError:
             continue
     
     return date_str
@@ -1125,6 +1230,25 @@ EXCLUDE_KEYWORDS = [
     "ra mắt sản phẩm", "new product launch" # trừ khi là sản phẩm tài chính lớn
 ]
 
+RELEVANCE_BONUS_PATTERNS = ["TỶ ĐỒNG", "NGHÌN TỶ", "TRIỆU USD", "MILLION", "BILLION"]
+
+# Uppercased once, keeping the original spelling for matched_keywords
+EXCLUDE_KEYWORDS_UPPER = frozenset(word.upper() for word in EXCLUDE_KEYWORDS)
+FINANCIAL_KEYWORDS_UPPER = {
+    group: [(keyword, keyword.upper()) for keyword in keywords]
+    for group, keywords in FINANCIAL_KEYWORDS.items()
+}
+
+def _build_relevance_automaton():
+    """One Aho-Corasick automaton over every keyword check_financial_relevance looks for"""
+    automaton = ahocorasick.Automaton()
+    for word in itertools.chain(EXCLUDE_KEYWORDS, RELEVANCE_BONUS_PATTERNS, *FINANCIAL_KEYWORDS.values()):
+        automaton.add_word(word.upper(), word.upper())
+    automaton.make_automaton()
+    return automaton
+
+RELEVANCE_AUTOMATON = _build_relevance_automaton()
+
 def check_financial_relevance(title, content, ticker):
     """
     Kiểm tra xem tin có liên quan đến TÀI CHÍNH không
@@ -1132,30 +1256,32 @@ def check_financial_relevance(title, content, ticker):
     """
     text = (title + " " + content[:1500]).upper()  # Chỉ check 1500 ký tự đầu
     
+    # One pass finds every keyword present (overlapping matches included, like `in`)
+    found = {word for _, word in RELEVANCE_AUTOMATON.iter(text)}
+    
     # 1. Check exclude keywords trước (loại bỏ tin không quan trọng)
-    for exclude_word in EXCLUDE_KEYWORDS:
-        if exclude_word.upper() in text:
-            return False, 0, []
+    if not found.isdisjoint(EXCLUDE_KEYWORDS_UPPER):
+        return False, 0, []
     
     # 2. Count matched financial keywords
     matched_keywords = []
     score = 0
     
     # Common financial keywords (trọng số 1)
-    for keyword in FINANCIAL_KEYWORDS["common"]:
-        if keyword.upper() in text:
+    for keyword, keyword_upper in FINANCIAL_KEYWORDS_UPPER["common"]:
+        if keyword_upper in found:
             matched_keywords.append(keyword)
             score += 1
     
     # Ticker-specific keywords (trọng số 2)
-    if ticker in FINANCIAL_KEYWORDS:
-        for keyword in FINANCIAL_KEYWORDS[ticker]:
-            if keyword.upper() in text:
+    if ticker in FINANCIAL_KEYWORDS_UPPER:
+        for keyword, keyword_upper in FINANCIAL_KEYWORDS_UPPER[ticker]:
+            if keyword_upper in found:
                 matched_keywords.append(keyword)
                 score += 2  # Keywords đặc thù có trọng số cao hơn
     
     # 3. Bonus nếu có số liệu cụ thể
-    if any(pattern in text for pattern in ["TỶ ĐỒNG", "NGHÌN TỶ", "TRIỆU USD", "MILLION", "BILLION"]):
+    if any(pattern in found for pattern in RELEVANCE_BONUS_PATTERNS):
         score += 1
     
     # 4. Check ticker mention
@@ -1167,22 +1293,14 @@ def check_financial_relevance(title, content, ticker):
     
     return is_relevant, score, matched_keywords[:5]  # Top 5 keywords
 
+# Case-insensitive raw-bytes check per ticker, run before parsing
+TICKER_PREFILTERS = {ticker: re.compile(re.escape(ticker.encode()), re.IGNORECASE) for ticker in TICKERS}
+
 def detect_ticker_in_content(title, content, ticker):
     """Check if ticker is mentioned in content AND financially relevant"""
-    # Check basic mention
-    text = (title + " " + content).upper()
-    
-    patterns = [
-        ticker,
-        f" {ticker} ",
-        f"({ticker})",
-        f"{ticker},",
-        f"{ticker}.",
-    ]
-    
-    has_ticker = any(pattern in text for pattern in patterns)
-    
-    if not has_ticker:
+    # Check basic mention (every old " X ", "(X)", "X," / "X." pattern contains X itself,
+    # so one substring scan per field gives the same answer)
+    if ticker not in title.upper() and ticker not in content.upper():
         return False
     
     # Check financial relevance
@@ -1190,37 +1308,164 @@ def detect_ticker_in_content(title, content, ticker):
     
     return is_relevant
 
-def process_article(source, url, ticker):
+def parse_cafef_content(html):
+    """Extract title, content, date từ HTML bài CafeF"""
+    tree = LexborHTMLParser(html)
+    
+    title = ""
+    title_elem = tree.css_first(".title-detail, h1")
+    if title_elem:
+        title = title_elem.text(strip=True)
+    
+    content = ""
+    content_elem = tree.css_first(".detail-content, .main-content")
+    if content_elem:
+        content = join_paragraphs(content_elem.css("p"))
+    
+    date_str = ""
+    date_elem = tree.css_first(".date, time")
+    if date_elem:
+        date_str = date_elem.text(strip=True)
+    
+    return title, content, date_str
+
+def extract_cafef_content(url):
+    """Extract content from CafeF (backup source)"""
+    try:
+        resp = http_get(url)
+        if resp.status_code != 200:
+            return None, None, None
+        
+        return parse_cafef_content(resp.content)
+    except:
+        return None, None, None
+
+# Pagination widget markers: a page that shows the widget but no next link is the last one
+PAGINATION_RE = re.compile(rb'class="[^"]*\b(?:button-page|pagination)\b')
+NEXT_PAGE_RE = re.compile(rb'rel="next"|class="[^"]*\bnext[-_]page\b')
+
+def is_last_page(html):
+    """True only when the page has pagination without a next link (unknown layouts keep paging)"""
+    return PAGINATION_RE.search(html) is not None and NEXT_PAGE_RE.search(html) is None
+
+async def crawl_search_pages(client, semaphore, limiter, page_url, parse_page, max_pages, max_empty):
+    """
+    Page through one search query until the last page (no next link) or until
+    max_empty consecutive pages come back empty/failed; pages are parsed off the event loop
+    """
+    links = []
+    loop = asyncio.get_running_loop()
+    consecutive_empty = 0
+    
+    for page in range(1, max_pages + 1):
+        if consecutive_empty >= max_empty:
+            break
+        
+        try:
+            async with semaphore:
+                await limiter.acquire()
+                resp = await client.get(page_url(page))
+            if resp.status_code != 200:
+                consecutive_empty += 1
+                continue
+            
+            has_results, page_links = await loop.run_in_executor(None, parse_page, resp.content)
+            if not has_results:
+                consecutive_empty += 1
+                continue
+            
+            links.extend(page_links)
+            consecutive_empty = 0
+            if is_last_page(resp.content):
+                break
+            
+        except Exception as e:
+            consecutive_empty += 1
+            await asyncio.sleep(0.5)
+    
+    return links
+
+def dedupe_links(links):
+    """Drop repeated URLs, keyed by 64-bit xxh3 hashes (first occurrence wins)"""
+    seen = set()
+    unique = []
+    for source, url in links:
+        key = xxhash.xxh3_64_intdigest(url.encode())
+        if key not in seen:
+            seen.add(key)
+            unique.append((source, url))
+    return unique
+
+def create_async_client():
+    """Shared async HTTP client for search and article pages (one connection pool per host)"""
+    return httpx.AsyncClient(
+        headers=HEADERS,
+        timeout=10,
+        follow_redirects=True,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        transport=create_cache_transport(httpx.AsyncHTTPTransport(retries=MAX_RETRIES))
+    )
+
+# Sources whose article HTML is fetched on the event loop and parsed in a worker thread
+ARTICLE_PARSERS = {
+    'vnexpress': VnExpressCrawler.parse_content,
+    'cafef': parse_cafef_content,
+}
+
+# Remaining sources still fetch + parse with their blocking extract_content
+ARTICLE_EXTRACTORS = {
+    'dantri': DanTriCrawler.extract_content,
+    'thanhnien': ThanhNienCrawler.extract_content,
+    'vietstock': VietstockCrawler.extract_content,
+    'stockbiz': StockbizCrawler.extract_content,
+    'ndh': NDHCrawler.extract_content,
+    'tinnhanhchungkhoan': TinnhanhchungkhoanCrawler.extract_content,
+    'baodautu': BaodautuCrawler.extract_content,
+    'vietfinance': VietFinanceCrawler.extract_content,
+}
+
+async def fetch_article(client, semaphore, limiter, url):
+    """Download article HTML as raw bytes, None on error or non-200 response"""
+    async with semaphore:
+        await limiter.acquire()
+        try:
+            resp = await client.get(url)
+        except Exception:
+            return None
+    
+    if resp.status_code != 200:
+        return None
+    return resp.content
+
+async def process_article(client, semaphores, limiters, parse_pool, source, url, ticker):
     """Process single article from any source"""
     if url in seen_urls:
         return None
     
     seen_urls.add(url)
+    loop = asyncio.get_running_loop()
     
     # Extract content based on source
-    if source == 'vnexpress':
-        title, content, date_str = VnExpressCrawler.extract_content(url)
-    elif source == 'dantri':
-        title, content, date_str = DanTriCrawler.extract_content(url)
-    elif source == 'thanhnien':
-        title, content, date_str = ThanhNienCrawler.extract_content(url)
-    elif source == 'cafef':
-        title, content, date_str = extract_cafef_content(url)
-    elif source == 'vietstock':
-        title, content, date_str = VietstockCrawler.extract_content(url)
-    elif source == 'stockbiz':
-        title, content, date_str = StockbizCrawler.extract_content(url)
-    elif source == 'ndh':
-        title, content, date_str = NDHCrawler.extract_content(url)
-    elif source == 'tinnhanhchungkhoan':
-        title, content, date_str = TinnhanhchungkhoanCrawler.extract_content(url)
-    elif source == 'baodautu':
-        title, content, date_str = BaodautuCrawler.extract_content(url)
-    elif source == 'vietfinance':
-        title, content, date_str = VietFinanceCrawler.extract_content(url)
+    if source in ARTICLE_PARSERS:
+        html = await fetch_article(client, semaphores[source], limiters[source], url)
+        if html is None:
+            return None
+        return await loop.run_in_executor(parse_pool, parse_and_build_record, source, url, ticker, html)
+    elif source in ARTICLE_EXTRACTORS:
+        title, content, date_str = await loop.run_in_executor(None, ARTICLE_EXTRACTORS[source], url)
+        return build_record(source, url, ticker, title, content, date_str)
     else:
         return None
-    
+
+def parse_and_build_record(source, url, ticker, html):
+    """Parse article HTML and validate it (runs in a parse worker process)"""
+    # detect_ticker_in_content needs the ticker somewhere in the page, so skip the parse without it
+    if not TICKER_PREFILTERS[ticker].search(html):
+        return None
+    return build_record(source, url, ticker, *ARTICLE_PARSERS[source](html))
+
+def build_record(source, url, ticker, title, content, date_str):
+    """Validate extracted article and build the CSV row (None if rejected)"""
     # Validate
     if not content or len(content) < 100:
         return None
@@ -1259,60 +1504,49 @@ def process_article(source, url, ticker):
         "source": f"{source}:{url}"
     }
 
-def extract_cafef_content(url):
-    """Extract content from CafeF (backup source)"""
-    headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
-    
-    try:
-        resp = requests.get(url, headers=headers, timeout=10)
-        if resp.status_code != 200:
-            return None, None, None
-        
-        soup = BeautifulSoup(resp.text, "html.parser")
-        
-        title = ""
-        title_elem = soup.select_one(".title-detail, h1")
-        if title_elem:
-            title = title_elem.get_text(strip=True)
-        
-        content = ""
-        content_elem = soup.select_one(".detail-content, .main-content")
-        if content_elem:
-            paragraphs = content_elem.select("p")
-            if paragraphs:
-                content = " ".join([p.get_text(strip=True) for p in paragraphs if len(p.get_text(strip=True)) > 20])
-        
-        date_str = ""
-        date_elem = soup.select_one(".date, time")
-        if date_elem:
-            date_str = date_elem.get_text(strip=True)
-        
-        return title, content, date_str
-    except:
-        return None, None, None
+CSV_FIELDS = ["date", "time", "title", "content", "ticker", "source"]
+CSV_SCHEMA = pa.schema([(field, pa.string()) for field in CSV_FIELDS])
+CSV_SENTINEL = None
+CSV_BUFFER_SIZE = 1 << 20  # 1 MiB userspace buffer in front of the output file
 
-def save_batch_to_csv(batch, output_file, write_header=False):
-    """Save batch to CSV (thread-safe) - SINGLE FILE"""
-    with csv_lock:
-        # Check if file exists to determine if header needed
-        file_exists = os.path.exists(output_file)
-        
-        mode = 'a'
-        with open(output_file, mode, encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=["date", "time", "title", "content", "ticker", "source"])
-            if not file_exists or write_header:
-                writer.writeheader()
-            for row in batch:
-                writer.writerow(row)
+def csv_writer_loop(row_queue, output_file):
+    """
+    Single consumer thread: buffers rows column-wise and writes each BATCH_SIZE
+    block as one Arrow table to the CSV kept open for the whole crawl
+    """
+    columns = {field: [] for field in CSV_FIELDS}
+    
+    def flush_columns(writer):
+        writer.write_table(pa.Table.from_pydict(columns, schema=CSV_SCHEMA))
+        for values in columns.values():
+            values.clear()
+    
+    with pa.output_stream(output_file, buffer_size=CSV_BUFFER_SIZE) as sink, \
+            pacsv.CSVWriter(sink, CSV_SCHEMA) as writer:
+        for count, row in enumerate(iter(row_queue.get, CSV_SENTINEL), 1):
+            for field, values in columns.items():
+                values.append(row[field])
+            if count % BATCH_SIZE == 0:
+                flush_columns(writer)
+        
+        if columns["date"]:
+            flush_columns(writer)
 
 def crawl_multi_source(output_file):
     """Main crawler - crawl từ nhiều nguồn - SAVE TO SINGLE FILE"""
-    batch = []
-    
-    # Remove old file if exists
-    if os.path.exists(output_file):
-        os.remove(output_file)
+    row_queue = queue.Queue()
+    writer_thread = Thread(target=csv_writer_loop, args=(row_queue, output_file), daemon=True)
+    writer_thread.start()
     
+    try:
+        with ProcessPoolExecutor(max_workers=PARSE_WORKERS) as parse_pool:
+            return asyncio.run(crawl_multi_source_async(output_file, row_queue, parse_pool))
+    finally:
+        row_queue.put(CSV_SENTINEL)
+        writer_thread.join()
+
+async def crawl_multi_source_async(output_file, row_queue, parse_pool):
+    """Async crawl loop: one shared httpx client, per-source concurrency limits"""
     total_records = 0
     ticker_year_stats = {}
     
@@ -1326,63 +1560,57 @@ def crawl_multi_source(output_file):
     print(f"[INFO] Target: 250+ articles/ticker/year", file=sys.stderr)
     print(f"[INFO] Output: Single CSV file → {output_file}", file=sys.stderr)
     
-    # Crawl theo từng NĂM và TICKER
-    for year in range(START_DATE.year, END_DATE.year + 1):
-        print(f"\n{'#'*70}", file=sys.stderr)
-        print(f"[YEAR] 📅 {year}", file=sys.stderr)
-        print(f"{'#'*70}", file=sys.stderr)
-        
-        for ticker in TICKERS:
-            print(f"\n[{year}] 💼 Ticker: {ticker}", file=sys.stderr)
-            
-            # Collect links from all sources
-            all_links = []
-            
-            # VnExpress (80 pages - primary source)
-            print(f"  📰 Crawling VnExpress...", file=sys.stderr)
-            vnexpress_links = VnExpressCrawler.get_article_links(ticker, year, max_pages=80)
-            all_links.extend(vnexpress_links)
-            print(f"    ✅ Found {len(vnexpress_links)} links", file=sys.stderr)
-            
-            # CafeF (50 pages - secondary source)
-            print(f"  📰 Crawling CafeF...", file=sys.stderr)
-            cafef_links = CafeFCrawler.get_article_links(ticker, year, max_pages=50)
-            all_links.extend(cafef_links)
-            print(f"    ✅ Found {len(cafef_links)} links", file=sys.stderr)
-            
-            if not all_links:
-                print(f"  ⚠️  No articles found for {ticker} in {year}", file=sys.stderr)
-                continue
-            
-            print(f"  🔄 Processing {len(all_links)} articles...", file=sys.stderr)
+    # One semaphore per source so a slow site can't starve the others
+    semaphores = {source: asyncio.Semaphore(MAX_WORKERS)
+                  for source in ['vnexpress', 'cafef', *ARTICLE_EXTRACTORS]}
+    # Token bucket per host replaces the fixed per-request sleep (sync sources throttle in http_get)
+    limiters = {source: RateLimiter(REQUESTS_PER_SECOND) for source in ARTICLE_PARSERS}
+    
+    async with create_async_client() as client:
+        # Crawl theo từng NĂM và TICKER
+        for year in range(START_DATE.year, END_DATE.year + 1):
+            print(f"\n{'#'*70}", file=sys.stderr)
+            print(f"[YEAR] 📅 {year}", file=sys.stderr)
+            print(f"{'#'*70}", file=sys.stderr)
             
-            # Process articles
-            ticker_year_count = 0
-            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-                futures = {executor.submit(process_article, source, url, ticker): (source, url) for source, url in all_links}
+            for ticker in TICKERS:
+                print(f"\n[{year}] 💼 Ticker: {ticker}", file=sys.stderr)
+                
+                # Collect links from all sources (VnExpress 80 pages - primary, CafeF 50 pages - secondary)
+                print(f"  📰 Crawling VnExpress + CafeF...", file=sys.stderr)
+                vnexpress_links, cafef_links = await asyncio.gather(
+                    VnExpressCrawler.get_article_links(client, semaphores['vnexpress'], limiters['vnexpress'], ticker, year, max_pages=80),
+                    CafeFCrawler.get_article_links(client, semaphores['cafef'], limiters['cafef'], ticker, year, max_pages=50)
+                )
+                print(f"    ✅ VnExpress: {len(vnexpress_links)} links", file=sys.stderr)
+                print(f"    ✅ CafeF: {len(cafef_links)} links", file=sys.stderr)
+                all_links = dedupe_links(vnexpress_links + cafef_links)
                 
-                for future in as_completed(futures):
+                if not all_links:
+                    print(f"  ⚠️  No articles found for {ticker} in {year}", file=sys.stderr)
+                    continue
+                
+                print(f"  🔄 Processing {len(all_links)} articles...", file=sys.stderr)
+                
+                # Process articles
+                ticker_year_count = 0
+                tasks = [process_article(client, semaphores, limiters, parse_pool, source, url, ticker) for source, url in all_links]
+                
+                for coro in asyncio.as_completed(tasks):
                     try:
-                        result = future.result()
+                        result = await coro
                         if result:
-                            batch.append(result)
+                            row_queue.put(result)
                             total_records += 1
                             ticker_year_count += 1
                             
-                            if len(batch) >= BATCH_SIZE:
-                                save_batch_to_csv(batch, output_file)
-                                print(f"[SAVE] ✅ Saved {len(batch)} records. Total: {total_records}", file=sys.stderr)
-                                batch = []
+                            if total_records % BATCH_SIZE == 0:
+                                print(f"[SAVE] ✅ Queued {BATCH_SIZE} records. Total: {total_records}", file=sys.stderr)
                     except Exception as e:
                         pass
-            
-            ticker_year_stats[f"{year}_{ticker}"] = ticker_year_count
-            print(f"  ✅ {ticker} {year}: {ticker_year_count} articles", file=sys.stderr)
-    
-    # Save final batch
-    if batch:
-        save_batch_to_csv(batch, output_file)
-        print(f"\n[SAVE] ✅ Saved final batch of {len(batch)} records", file=sys.stderr)
+                
+                ticker_year_stats[f"{year}_{ticker}"] = ticker_year_count
+                print(f"  ✅ {ticker} {year}: {ticker_year_count} articles", file=sys.stderr)
     
     # Print summary
     print("\n" + "="*70, file=sys.stderr)
@@ -1397,6 +1625,7 @@ def crawl_multi_source(output_file):
     
     return total_records
 
+
 if __name__ == "__main__":
     print("="*70)
     print("🌐 MULTI-SOURCE VIETNAMESE STOCK NEWS CRAWLER")
@@ -271,9 +271,8 @@ def create_advanced_features(df: pd.DataFrame) -> pd.DataFrame:
     
     result_dfs = []
     
-    for symbol in df['symbol'].unique():
+    for symbol, symbol_df in df.groupby('symbol', sort=False):
         logger.info(f"  Processing {symbol} - Advanced indicators...")
-        symbol_df = df[df['symbol'] == symbol].copy()
         symbol_df = symbol_df.sort_values('time')
         
         close = symbol_df['close']
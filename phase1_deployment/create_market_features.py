@@ -34,6 +34,14 @@ for sector, stocks in SECTOR_GROUPS.items():
         STOCK_TO_SECTOR[stock] = sector
 
 
+def split_by_symbol(df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Partition df into per-symbol frames sorted by time in a single groupby pass
+    (instead of scanning the whole frame with a boolean mask per symbol)
+    """
+    return {symbol: group.sort_values('time') for symbol, group in df.groupby('symbol', sort=False)}
+
+
 def calculate_sector_momentum(df: pd.DataFrame, sector: str, stocks: List[str], 
                                periods: List[int] = [5, 10, 20]) -> pd.DataFrame:
     """
@@ -45,13 +53,13 @@ def calculate_sector_momentum(df: pd.DataFrame, sector: str, stocks: List[str],
     - Number of stocks trending up/down
     """
     result_features = {}
+    by_symbol = split_by_symbol(df)
     
     for period in periods:
         sector_returns = []
         
         for stock in stocks:
-            stock_data = df[df['symbol'] == stock].copy()
-            stock_data = stock_data.sort_values('time')
+            stock_data = by_symbol.get(stock, df.iloc[:0])
             
             # Calculate return for this stock
             if 'close' in stock_data.columns:
@@ -81,6 +89,7 @@ def calculate_market_correlation(df: pd.DataFrame, window: int = 20) -> Dict[str
     Returns correlation for each stock with its sector average
     """
     correlations = {}
+    by_symbol = split_by_symbol(df)
     
     # Group by sector
     for sector, stocks in SECTOR_GROUPS.items():
@@ -90,8 +99,7 @@ def calculate_market_correlation(df: pd.DataFrame, window: int = 20) -> Dict[str
         # Get returns for all stocks in sector
         returns_dict = {}
         for stock in stocks:
-            stock_data = df[df['symbol'] == stock].copy()
-            stock_data = stock_data.sort_values('time')
+            stock_data = by_symbol.get(stock, df.iloc[:0])
             if 'close' in stock_data.columns:
                 returns_dict[stock] = stock_data['close'].pct_change()
         
@@ -117,13 +125,12 @@ def calculate_relative_strength(df: pd.DataFrame, periods: List[int] = [5, 10, 2
     RS = (Stock Return - Sector Average Return) / Sector Std Dev
     """
     result_features = {}
+    by_symbol = split_by_symbol(df)
     
     for period in periods:
         # Calculate returns for each stock
         stock_returns = {}
-        for symbol in df['symbol'].unique():
-            stock_data = df[df['symbol'] == symbol].copy()
-            stock_data = stock_data.sort_values('time')
+        for symbol, stock_data in by_symbol.items():
             stock_returns[symbol] = stock_data['close'].pct_change(period)
         
         # Calculate sector averages
@@ -151,6 +158,7 @@ def calculate_cross_stock_features(df: pd.DataFrame, window: int = 20) -> Dict[s
     For banking sector, check if larger banks (VCB, BID) lead smaller ones (ACB, MBB)
     """
     features_by_stock = {}
+    by_symbol = split_by_symbol(df)
     
     # Banking sector analysis
     banking_stocks = SECTOR_GROUPS.get('banking', [])
@@ -162,9 +170,8 @@ def calculate_cross_stock_features(df: pd.DataFrame, window: int = 20) -> Dict[s
         # Get leader returns
         leader_returns = {}
         for leader in leaders:
-            if leader in df['symbol'].unique():
-                leader_data = df[df['symbol'] == leader].copy()
-                leader_data = leader_data.sort_values('time')
+            if leader in by_symbol:
+                leader_data = by_symbol[leader]
                 leader_returns[leader] = leader_data['close'].pct_change()
         
         if leader_returns:
@@ -173,9 +180,8 @@ def calculate_cross_stock_features(df: pd.DataFrame, window: int = 20) -> Dict[s
             
             # For each follower, calculate correlation with leader
             for follower in followers:
-                if follower in df['symbol'].unique():
-                    follower_data = df[df['symbol'] == follower].copy()
-                    follower_data = follower_data.sort_values('time')
+                if follower in by_symbol:
+                    follower_data = by_symbol[follower]
                     follower_return = follower_data['close'].pct_change()
                     
                     # Rolling correlation with leaders
@@ -205,6 +211,7 @@ def calculate_market_breadth(df: pd.DataFrame, window: int = 20) -> pd.DataFrame
     
     # Get all unique dates
     dates = sorted(df['time'].unique())
+    by_symbol = split_by_symbol(df)
     
     breadth_data = []
     for date in dates:
@@ -215,8 +222,7 @@ def calculate_market_breadth(df: pd.DataFrame, window: int = 20) -> pd.DataFrame
         total = 0
         
         for symbol in date_df['symbol'].unique():
-            symbol_history = df[df['symbol'] == symbol].copy()
-            symbol_history = symbol_history.sort_values('time')
+            symbol_history = by_symbol.get(symbol, df.iloc[:0])
             
             current_idx = symbol_history[symbol_history['time'] == date].index
             if len(current_idx) > 0:
@@ -253,16 +259,14 @@ def calculate_dispersion(df: pd.DataFrame, window: int = 20) -> pd.DataFrame:
     result_features = {}
     
     dates = sorted(df['time'].unique())
+    by_symbol = split_by_symbol(df)
     
     dispersion_data = []
     for date in dates:
         # Get returns for all stocks at this date
         date_returns = []
         
-        for symbol in df['symbol'].unique():
-            symbol_history = df[df['symbol'] == symbol].copy()
-            symbol_history = symbol_history.sort_values('time')
-            
+        for symbol_history in by_symbol.values():
             current_idx = symbol_history[symbol_history['time'] == date].index
             if len(current_idx) > 0:
                 current_idx = current_idx[0]
@@ -353,10 +357,8 @@ def create_market_features(df: pd.DataFrame) -> pd.DataFrame:
     
     result_dfs = []
     
-    for symbol in df['symbol'].unique():
+    for symbol, symbol_df in split_by_symbol(df).items():
         logger.info(f"    Processing {symbol}...")
-        symbol_df = df[df['symbol'] == symbol].copy()
-        symbol_df = symbol_df.sort_values('time')
         
         # Add sector features (same for all stocks, based on date)
         if not sector_features.empty:
@@ -27,9 +27,6 @@ from sklearn.metrics import r2_score, mean_absolute_error
 from catboost import CatBoostRegressor
 import lightgbm as lgb
 
-import matplotlib.pyplot as plt
-import seaborn as sns
-
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
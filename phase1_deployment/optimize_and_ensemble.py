@@ -8,25 +8,37 @@ Hyperparameter Tuning & Ensemble Methods
 Target: R² > 0.05, Directional Accuracy > 50%
 """
 
+import os
+
+# Pin OpenBLAS/MKL to one thread (NumPy, Ridge stacker); OpenMP (LightGBM) still gets one
+# thread per core, and CatBoost sizes its own pool from thread_count
+os.environ.setdefault('OMP_NUM_THREADS', str(os.cpu_count() or 1))
+os.environ.setdefault('OPENBLAS_NUM_THREADS', '1')
+os.environ.setdefault('MKL_NUM_THREADS', '1')
+
 import pandas as pd
 import numpy as np
 from pathlib import Path
 import logging
+import tempfile
 from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
-from sklearn.model_selection import TimeSeriesSplit, GridSearchCV, RandomizedSearchCV
+from sklearn.model_selection import TimeSeriesSplit, GridSearchCV, ParameterSampler
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score, make_scorer
 from sklearn.linear_model import Ridge
 
-from catboost import CatBoostRegressor
+from catboost import CatBoostRegressor, Pool, cv
 import lightgbm as lgb
+import joblib
+import pyarrow.parquet as pq
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+N_JOBS = os.cpu_count() or 1
+
 
 class OptimizedEnsemble:
     """
@@ -48,6 +60,8 @@ class OptimizedEnsemble:
         self.X_test = None
         self.y_train = None
         self.y_test = None
+        self.y_test_np = None
+        self.sign_y_test = None
         self.feature_names = []
         self.scaler = StandardScaler()
         
@@ -60,9 +74,19 @@ class OptimizedEnsemble:
         self.results = []
         
     def load_data(self):
-        """Load selected features"""
+        """Load selected features (via a Parquet cache next to the CSV)"""
         logger.info(f"Loading data from: {self.data_path}")
-        self.df = pd.read_csv(self.data_path)
+        parquet_path = self.data_path.with_suffix('.parquet')
+        
+        if (parquet_path.exists()
+                and parquet_path.stat().st_mtime >= self.data_path.stat().st_mtime):
+            self.df = pq.read_table(parquet_path, memory_map=True).to_pandas()
+            logger.info(f"  Using Parquet cache: {parquet_path}")
+        else:
+            self.df = pd.read_csv(self.data_path, parse_dates=['time'], date_format='ISO8601')
+            self.df.to_parquet(parquet_path, compression='zstd', index=False)
+            logger.info(f"  Wrote Parquet cache: {parquet_path}")
+        
         logger.info(f"  Loaded: {self.df.shape}")
         
         return self
@@ -71,7 +95,10 @@ class OptimizedEnsemble:
         """Prepare train/test split"""
         logger.info(f"\nPreparing data (test_size={test_size})...")
         
-        self.df = self.df.sort_values('time')
+        # Sort on a contiguous int64 key, then gather rows once
+        time_ns = pd.to_datetime(self.df['time'], format='ISO8601').to_numpy(dtype='datetime64[ns]').view('int64')
+        order = np.argsort(time_ns, kind='stable')
+        self.df = self.df.iloc[order].reset_index(drop=True)
         
         metadata_cols = ['symbol', 'date', 'time', 'open', 'high', 'low', 'close', 'volume']
         feature_cols = [c for c in self.df.columns 
@@ -96,38 +123,42 @@ class OptimizedEnsemble:
         self.y_train = train_df[self.target_col]
         self.X_test = test_df[feature_cols]
         self.y_test = test_df[self.target_col]
+        self.y_test_np = self.y_test.to_numpy(dtype=np.float64)
+        self.sign_y_test = np.sign(self.y_test_np).astype(np.int8)
         
         # Handle NaN
         self.X_train = self.X_train.fillna(method='ffill').fillna(method='bfill').fillna(0)
         self.X_test = self.X_test.fillna(method='ffill').fillna(method='bfill').fillna(0)
         
-        # Scale
-        self.X_train = pd.DataFrame(
-            self.scaler.fit_transform(self.X_train),
-            columns=feature_cols,
-            index=self.X_train.index
-        )
-        self.X_test = pd.DataFrame(
-            self.scaler.transform(self.X_test),
-            columns=feature_cols,
-            index=self.X_test.index
-        )
+        # Scale straight into float32 arrays (column names stay in self.feature_names)
+        self.X_train = np.ascontiguousarray(self.scaler.fit_transform(self.X_train), dtype=np.float32)
+        self.X_test = np.ascontiguousarray(self.scaler.transform(self.X_test), dtype=np.float32)
         
         logger.info("✅ Data preparation complete")
         
         return self
     
-    def evaluate_model(self, y_true, y_pred, model_name: str = 'Model') -> dict:
-        """Calculate metrics"""
-        mse = mean_squared_error(y_true, y_pred)
+    def evaluate_model(self, y_true, y_pred, model_name: str = 'Model', sign_y_true=None) -> dict:
+        """
+        Calculate metrics from a single residual array
+        
+        Args:
+            sign_y_true: Precomputed int8 np.sign(y_true) (computed here if None)
+        """
+        y_true = np.asarray(y_true, dtype=np.float64)
+        y_pred = np.asarray(y_pred, dtype=np.float64)
+        if sign_y_true is None:
+            sign_y_true = np.sign(y_true).astype(np.int8)
+        
+        residual = y_true - y_pred
+        mse = float(np.dot(residual, residual) / residual.size)
         rmse = np.sqrt(mse)
-        mae = mean_absolute_error(y_true, y_pred)
-        r2 = r2_score(y_true, y_pred)
+        mae = float(np.abs(residual).mean())
+        r2 = 1.0 - mse / (float(y_true.var()) + 1e-12)
         
-        # Directional accuracy
-        direction_true = np.sign(y_true)
-        direction_pred = np.sign(y_pred)
-        directional_accuracy = np.mean(direction_true == direction_pred) * 100
+        # Directional accuracy (int8 signs compare in packed SIMD lanes)
+        sign_pred = np.sign(y_pred).astype(np.int8)
+        directional_accuracy = float((sign_y_true == sign_pred).mean() * 100)
         
         return {
             'Model': model_name,
@@ -137,6 +168,13 @@ class OptimizedEnsemble:
             'Test_DirectionalAccuracy': directional_accuracy
         }
     
+    def _early_stopping_split(self, val_fraction: float = 0.1):
+        """Split the last val_fraction of the (time-sorted) train set off as a holdout"""
+        n_val = max(1, int(len(self.X_train) * val_fraction))
+        X_tr, X_val = self.X_train[:-n_val], self.X_train[-n_val:]
+        y_tr, y_val = self.y_train.iloc[:-n_val], self.y_train.iloc[-n_val:]
+        return X_tr, X_val, y_tr, y_val
+    
     def tune_catboost(self):
         """
         Hyperparameter tuning for CatBoost using GridSearchCV
@@ -153,16 +191,18 @@ class OptimizedEnsemble:
             'iterations': [300, 500]
         }
         
+        n_combinations = int(np.prod([len(v) for v in param_grid.values()]))
         logger.info(f"Parameter grid: {param_grid}")
-        logger.info(f"Total combinations: {np.prod([len(v) for v in param_grid.values()])}")
+        logger.info(f"Total combinations: {n_combinations}")
         
         # TimeSeriesSplit for cross-validation
         tscv = TimeSeriesSplit(n_splits=3)
         
-        # Base model
+        # Base model (single-threaded; GridSearchCV parallelizes across candidates)
         base_model = CatBoostRegressor(
             random_seed=42,
-            verbose=False
+            verbose=False,
+            thread_count=1
         )
         
         # GridSearchCV with negative MAE (higher is better)
@@ -171,28 +211,47 @@ class OptimizedEnsemble:
             param_grid=param_grid,
             cv=tscv,
             scoring='neg_mean_absolute_error',
-            n_jobs=-1,
+            n_jobs=min(n_combinations, N_JOBS),
+            pre_dispatch='n_jobs',
+            return_train_score=False,
+            refit=False,  # final model is refit below with early stopping
             verbose=1
         )
         
         logger.info("Starting grid search (this may take a while)...")
-        grid_search.fit(self.X_train, self.y_train)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            # Share one read-only float32 copy of X_train across all workers
+            mmap_path = Path(tmp_dir) / 'X_train.mmap'
+            joblib.dump(self.X_train, mmap_path)
+            X_train_mmap = joblib.load(mmap_path, mmap_mode='r')
+            grid_search.fit(X_train_mmap, self.y_train.to_numpy())
+            del X_train_mmap
         
         logger.info(f"✅ Grid search complete!")
         logger.info(f"   Best params: {grid_search.best_params_}")
         logger.info(f"   Best CV score (neg MAE): {grid_search.best_score_:.6f}")
         
-        # Train final model with best params
+        # Train final model with best params, early-stopped on a chronological holdout
+        X_tr, X_val, y_tr, y_val = self._early_stopping_split()
         self.best_catboost = CatBoostRegressor(
             **grid_search.best_params_,
             random_seed=42,
+            thread_count=N_JOBS,
             verbose=False
         )
-        self.best_catboost.fit(self.X_train, self.y_train)
+        self.best_catboost.fit(
+            X_tr, y_tr,
+            eval_set=(X_val, y_val),
+            early_stopping_rounds=50,
+            verbose=False
+        )
+        logger.info(f"   Early stopping kept {self.best_catboost.tree_count_} trees")
         
         # Evaluate
         y_pred = self.best_catboost.predict(self.X_test)
-        metrics = self.evaluate_model(self.y_test, y_pred, 'CatBoost_Tuned')
+        metrics = self.evaluate_model(
+            self.y_test_np, y_pred, 'CatBoost_Tuned', sign_y_true=self.sign_y_test
+        )
         self.results.append(metrics)
         
         logger.info(f"\n📊 Tuned CatBoost Results:")
@@ -204,7 +263,7 @@ class OptimizedEnsemble:
     
     def tune_lightgbm(self):
         """
-        Hyperparameter tuning for LightGBM using RandomizedSearchCV (faster)
+        Hyperparameter tuning for LightGBM using randomized search over lgb.cv (faster)
         """
         logger.info("\n" + "="*80)
         logger.info("HYPERPARAMETER TUNING - LIGHTGBM")
@@ -221,47 +280,74 @@ class OptimizedEnsemble:
         
         logger.info(f"Parameter grid: {param_grid}")
         logger.info(f"Total combinations: {np.prod([len(v) for v in param_grid.values()])}")
-        logger.info(f"Using RandomizedSearchCV with 20 iterations")
-        
-        # TimeSeriesSplit
-        tscv = TimeSeriesSplit(n_splits=3)
-        
-        # Base model
-        base_model = lgb.LGBMRegressor(
-            random_state=42,
-            verbose=-1
+        logger.info(f"Sampling 20 combinations with lgb.cv on a shared Dataset")
+        
+        # Bin the features once; lgb.cv reuses the binned Dataset for every trial and fold
+        dtrain = lgb.Dataset(
+            self.X_train,
+            label=self.y_train.to_numpy(dtype=np.float32),
+            params={'max_bin': 255, 'verbose': -1},
+            free_raw_data=False
         )
+        folds = list(TimeSeriesSplit(n_splits=3).split(self.X_train))
         
-        # RandomizedSearchCV (faster than GridSearchCV)
-        random_search = RandomizedSearchCV(
-            estimator=base_model,
-            param_distributions=param_grid,
-            n_iter=20,  # Try 20 random combinations
-            cv=tscv,
-            scoring='neg_mean_absolute_error',
-            n_jobs=-1,
-            verbose=1,
-            random_state=42
-        )
+        best_score = np.inf
+        best_params = None
+        best_rounds = None
         
         logger.info("Starting randomized search...")
-        random_search.fit(self.X_train, self.y_train)
+        for params in ParameterSampler(param_grid, n_iter=20, random_state=42):
+            trial_params = dict(params)
+            num_boost_round = trial_params.pop('n_estimators')
+            trial_params.update({
+                'objective': 'regression',
+                'metric': 'l1',
+                'seed': 42,
+                'num_threads': N_JOBS,
+                'verbose': -1
+            })
+            
+            cv_results = lgb.cv(
+                trial_params,
+                dtrain,
+                num_boost_round=num_boost_round,
+                folds=folds,
+                callbacks=[lgb.early_stopping(30, verbose=False)]
+            )
+            mae_key = next(k for k in cv_results if k.endswith('l1-mean'))
+            score = cv_results[mae_key][-1]
+            
+            if score < best_score:
+                best_score = score
+                best_params = params
+                best_rounds = len(cv_results[mae_key])
         
         logger.info(f"✅ Randomized search complete!")
-        logger.info(f"   Best params: {random_search.best_params_}")
-        logger.info(f"   Best CV score (neg MAE): {random_search.best_score_:.6f}")
+        logger.info(f"   Best params: {best_params} (best rounds: {best_rounds})")
+        logger.info(f"   Best CV score (neg MAE): {-best_score:.6f}")
         
-        # Train final model
+        # Train final model, early-stopped on a chronological holdout
+        X_tr, X_val, y_tr, y_val = self._early_stopping_split()
+        final_params = {k: v for k, v in best_params.items() if k != 'n_estimators'}
         self.best_lightgbm = lgb.LGBMRegressor(
-            **random_search.best_params_,
+            **final_params,
+            n_estimators=best_rounds,
             random_state=42,
+            n_jobs=N_JOBS,
             verbose=-1
         )
-        self.best_lightgbm.fit(self.X_train, self.y_train)
+        self.best_lightgbm.fit(
+            X_tr, y_tr,
+            eval_set=[(X_val, y_val)],
+            callbacks=[lgb.early_stopping(50, verbose=False), lgb.log_evaluation(0)]
+        )
+        logger.info(f"   Early stopping kept {self.best_lightgbm.best_iteration_} trees")
         
         # Evaluate
         y_pred = self.best_lightgbm.predict(self.X_test)
-        metrics = self.evaluate_model(self.y_test, y_pred, 'LightGBM_Tuned')
+        metrics = self.evaluate_model(
+            self.y_test_np, y_pred, 'LightGBM_Tuned', sign_y_true=self.sign_y_test
+        )
         self.results.append(metrics)
         
         logger.info(f"\n📊 Tuned LightGBM Results:")
@@ -299,7 +385,9 @@ class OptimizedEnsemble:
         for w_cb, w_lgb, desc in weights:
             ensemble_pred = w_cb * cb_pred + w_lgb * lgb_pred
             
-            metrics = self.evaluate_model(self.y_test, ensemble_pred, f'Ensemble_{desc}')
+            metrics = self.evaluate_model(
+                self.y_test_np, ensemble_pred, f'Ensemble_{desc}', sign_y_true=self.sign_y_test
+            )
             
             logger.info(f"\n  {desc}:")
             logger.info(f"    R²: {metrics['Test_R2']:.4f}")
@@ -329,41 +417,49 @@ class OptimizedEnsemble:
         # Generate out-of-fold predictions for training set
         tscv = TimeSeriesSplit(n_splits=5)
         
-        oof_cb = np.zeros(len(self.X_train))
-        oof_lgb = np.zeros(len(self.X_train))
+        # Meta-features written in place: column 0 = CatBoost OOF, column 1 = LightGBM OOF
+        meta_X_train = np.zeros((len(self.X_train), 2), dtype=np.float32)
         
         logger.info("Generating out-of-fold predictions...")
         
-        for fold, (train_idx, val_idx) in enumerate(tscv.split(self.X_train), 1):
+        folds = list(tscv.split(self.X_train))
+        
+        # CatBoost: one native cv call quantizes the pool once and trains every fold
+        logger.info("  CatBoost: catboost.cv over 5 time-series folds...")
+        cb_params = self.best_catboost.get_params()
+        cb_params.setdefault('loss_function', 'RMSE')
+        cb_pool = Pool(
+            self.X_train,
+            label=self.y_train.to_numpy(),
+            feature_names=list(self.feature_names)
+        )
+        _, cb_fold_models = cv(
+            cb_pool,
+            params=cb_params,
+            folds=folds,
+            return_models=True,
+            as_pandas=False,
+            logging_level='Silent'
+        )
+        
+        for fold, ((train_idx, val_idx), cb_fold) in enumerate(zip(folds, cb_fold_models), 1):
             logger.info(f"  Fold {fold}/5...")
             
-            X_fold_train = self.X_train.iloc[train_idx]
+            X_fold_train = self.X_train[train_idx]
             y_fold_train = self.y_train.iloc[train_idx]
-            X_fold_val = self.X_train.iloc[val_idx]
+            X_fold_val = self.X_train[val_idx]
             
-            # Train CatBoost
-            cb_fold = CatBoostRegressor(
-                **self.best_catboost.get_params(),
-                verbose=False
-            )
-            cb_fold.fit(X_fold_train, y_fold_train)
-            oof_cb[val_idx] = cb_fold.predict(X_fold_val)
+            meta_X_train[val_idx, 0] = cb_fold.predict(X_fold_val)
             
             # Train LightGBM
-            lgb_fold = lgb.LGBMRegressor(
-                **self.best_lightgbm.get_params(),
-                verbose=-1
-            )
+            lgb_fold = lgb.LGBMRegressor(**self.best_lightgbm.get_params())
             lgb_fold.fit(X_fold_train, y_fold_train)
-            oof_lgb[val_idx] = lgb_fold.predict(X_fold_val)
-        
-        # Create meta-features (OOF predictions)
-        meta_X_train = np.column_stack([oof_cb, oof_lgb])
+            meta_X_train[val_idx, 1] = lgb_fold.predict(X_fold_val)
         
         # Get test predictions from base models
-        cb_test_pred = self.best_catboost.predict(self.X_test)
-        lgb_test_pred = self.best_lightgbm.predict(self.X_test)
-        meta_X_test = np.column_stack([cb_test_pred, lgb_test_pred])
+        meta_X_test = np.empty((len(self.X_test), 2), dtype=np.float32)
+        meta_X_test[:, 0] = self.best_catboost.predict(self.X_test)
+        meta_X_test[:, 1] = self.best_lightgbm.predict(self.X_test)
         
         # Train meta-model (Ridge)
         logger.info("Training meta-model (Ridge)...")
@@ -374,7 +470,9 @@ class OptimizedEnsemble:
         stacking_pred = self.stacking_model.predict(meta_X_test)
         
         # Evaluate
-        metrics = self.evaluate_model(self.y_test, stacking_pred, 'Ensemble_Stacking')
+        metrics = self.evaluate_model(
+            self.y_test_np, stacking_pred, 'Ensemble_Stacking', sign_y_true=self.sign_y_test
+        )
         self.results.append(metrics)
         
         logger.info(f"\n📊 Stacking Results:")
@@ -10,45 +10,322 @@ Model Training Strategy:
 4. Feature importance analysis
 """
 
+import os
+
+# Pin OpenBLAS/MKL to one thread for the NumPy/pandas preprocessing; OpenMP (XGBoost,
+# LightGBM) still gets one thread per core so the tree learners own the machine
+os.environ.setdefault('OMP_NUM_THREADS', str(os.cpu_count() or 1))
+os.environ.setdefault('OPENBLAS_NUM_THREADS', '1')
+os.environ.setdefault('MKL_NUM_THREADS', '1')
+
 import pandas as pd
 import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pacsv
 from pathlib import Path
 import logging
+import csv
+import functools
+import hashlib
+import shutil
+import subprocess
+import tempfile
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import warnings
 warnings.filterwarnings('ignore')
 
-from sklearn.model_selection import TimeSeriesSplit
-from sklearn.preprocessing import StandardScaler
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+from sklearn.model_selection import TimeSeriesSplit, RandomizedSearchCV
+from scipy.stats import randint, uniform, loguniform
 
 import xgboost as xgb
 from catboost import CatBoostRegressor, Pool
 from sklearn.ensemble import RandomForestRegressor
 import lightgbm as lgb
-
-import matplotlib.pyplot as plt
-import seaborn as sns
+from numba import njit, types
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
+# Metadata columns that load_data skips entirely ('symbol'/'time' are still needed)
+UNUSED_COLUMNS = frozenset({'date', 'open', 'high', 'low', 'close', 'volume'})
+
+# Non-numeric columns kept by load_data ('time' is parsed to timestamps by the
+# CSV reader itself); everything else is read as float32
+TEXT_COLUMNS = frozenset({'symbol', 'time'})
+
+@functools.lru_cache(maxsize=None)
+def _cuda_available() -> bool:
+    """True if XGBoost was built with CUDA and an NVIDIA GPU is visible"""
+    if not xgb.build_info().get('USE_CUDA', False):
+        return False
+    if shutil.which('nvidia-smi') is None:
+        return False
+    try:
+        result = subprocess.run(['nvidia-smi', '-L'], capture_output=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return result.returncode == 0 and b'GPU' in result.stdout
+
+
+# Train_* metrics use every 10th train row unless a full pass is requested
+TRAIN_METRICS_STRIDE = 10
+
+# Bump when _split_and_scale/_ffill_rows (fill, split or scaling) change, so cached splits rebuild
+SPLIT_CACHE_VERSION = 1
+
+SPLIT_ARRAYS = (
+    'X_train', 'X_test', 'y_train', 'y_test', 'scaler_mean', 'scaler_std',
+    'train_dates', 'test_dates', 'train_symbols', 'test_symbols', 'feature_names'
+)
+
+
+def _ffill_rows(values: np.ndarray, block_start: np.ndarray) -> np.ndarray:
+    """Forward-fill NaNs down each column without carrying values across block starts"""
+    rows = np.arange(values.shape[0])[:, None]
+    idx = np.where(~np.isnan(values) | block_start[:, None], rows, 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    return np.take_along_axis(values, idx, axis=0)
+
+
+def _fill_missing_by_symbol(values: np.ndarray, symbols: np.ndarray,
+                            times: np.ndarray) -> np.ndarray:
+    """
+    Forward fill, then backward fill NaNs within each symbol; anything left becomes 0
+    
+    Args:
+        values: (n_rows, n_features) float array
+        symbols: Symbol of each row
+        times: int64 timestamp of each row (rows need not be in time order)
+        
+    Returns:
+        Filled array in the original row order
+    """
+    # Group rows by symbol, in time order inside each block
+    order = np.lexsort((times, symbols))
+    grouped = values[order]
+    sorted_symbols = symbols[order]
+    
+    block_start = np.ones(len(order), dtype=bool)
+    block_start[1:] = sorted_symbols[1:] != sorted_symbols[:-1]
+    block_end = np.roll(block_start, -1)
+    
+    grouped = _ffill_rows(grouped, block_start)
+    grouped = _ffill_rows(grouped[::-1], block_end[::-1])[::-1]
+    
+    filled = np.empty_like(grouped)
+    filled[order] = grouped
+    np.nan_to_num(filled, copy=False, nan=0.0)
+    return filled
+
+
+def _split_and_scale(df: pd.DataFrame, target_col: str, test_size: float) -> dict:
+    """
+    Split chronologically at a time cutoff and scale features
+    
+    Rows keep their input order (load_data already sorts by time); the cutoff is
+    found with np.partition rather than a full sort of the frame.
+    
+    Args:
+        df: Loaded features DataFrame
+        target_col: Name of target column
+        test_size: Fraction of data for testing
+        
+    Returns:
+        Dictionary of NumPy arrays keyed by SPLIT_ARRAYS
+    """
+    # Identify metadata columns
+    metadata_cols = ['symbol', 'date', 'time', 'open', 'high', 'low', 'close', 'volume']
+    
+    # Feature columns = all except metadata and target
+    feature_cols = [c for c in df.columns 
+                   if c not in metadata_cols and c != target_col]
+    logger.info(f"  Using {len(feature_cols)} features")
+    
+    # Remove rows with NaN in target
+    df_clean = df.dropna(subset=[target_col])
+    logger.info(f"  After removing NaN targets: {len(df_clean)} rows")
+    
+    # Time-based split: O(N) selection of the cutoff timestamp; rows on the cutoff go to test
+    times = pd.to_datetime(df_clean['time'], format='ISO8601').to_numpy(dtype='datetime64[ns]').view('int64')
+    k = min(int(len(times) * (1 - test_size)), len(times) - 1)
+    cutoff = np.partition(times, k)[k]
+    train_mask = times < cutoff
+    
+    train_df = df_clean[train_mask]
+    test_df = df_clean[~train_mask]
+    train_times = times[train_mask]
+    test_times = times[~train_mask]
+    
+    logger.info(f"  Train: {len(train_df)} rows ({train_df['time'].min()} to {train_df['time'].max()})")
+    logger.info(f"  Test:  {len(test_df)} rows ({test_df['time'].min()} to {test_df['time'].max()})")
+    
+    # Handle remaining NaN in features (forward fill then backward fill, per symbol)
+    X_train = _fill_missing_by_symbol(
+        train_df[feature_cols].to_numpy(dtype=np.float32), train_df['symbol'].to_numpy(), train_times
+    )
+    X_test = _fill_missing_by_symbol(
+        test_df[feature_cols].to_numpy(dtype=np.float32), test_df['symbol'].to_numpy(), test_times
+    )
+    
+    # Standardize in place on C-contiguous float32 arrays, with train-set mean/std
+    # (the tree libraries ingest these without conversion)
+    logger.info("  Scaling features...")
+    X_train = np.ascontiguousarray(X_train, dtype=np.float32)
+    X_test = np.ascontiguousarray(X_test, dtype=np.float32)
+    
+    scaler_mean = X_train.mean(axis=0, dtype=np.float64).astype(np.float32)
+    scaler_std = X_train.std(axis=0, dtype=np.float64).astype(np.float32)
+    scaler_std[scaler_std < 1e-8] = 1.0
+    
+    for X in (X_train, X_test):
+        np.subtract(X, scaler_mean, out=X)
+        np.divide(X, scaler_std, out=X)
+    
+    return {
+        'X_train': X_train,
+        'X_test': X_test,
+        'scaler_mean': scaler_mean,
+        'scaler_std': scaler_std,
+        'y_train': np.ascontiguousarray(train_df[target_col], dtype=np.float32),
+        'y_test': np.ascontiguousarray(test_df[target_col], dtype=np.float32),
+        'train_dates': train_df['time'].astype(str).to_numpy(dtype=str),
+        'test_dates': test_df['time'].astype(str).to_numpy(dtype=str),
+        'train_symbols': train_df['symbol'].astype(str).to_numpy(dtype=str),
+        'test_symbols': test_df['symbol'].astype(str).to_numpy(dtype=str),
+        'feature_names': np.array(feature_cols, dtype=str)
+    }
+
+
+def build_or_load_split(data_path, target_col: str = 'target_return', test_size: float = 0.2,
+                        cache_dir: str = 'data/cache', load_df=None) -> dict:
+    """
+    Build the scaled train/test split once and cache it as .npy files
+    
+    The cache key covers SPLIT_CACHE_VERSION, the dropped/text column sets, the CSV path
+    and mtime, target_col and test_size, so editing the CSV or changing the split rebuilds it. Cached arrays are opened with
+    mmap_mode='r', so several training processes share one copy of the data.
+    
+    Args:
+        data_path: Path to features CSV file
+        target_col: Name of target column
+        test_size: Fraction of data for testing
+        cache_dir: Directory holding cached splits
+        load_df: Callable returning the loaded DataFrame, only called on a cache miss
+                 (defaults to pd.read_csv(data_path))
+        
+    Returns:
+        Dictionary of NumPy arrays keyed by SPLIT_ARRAYS
+    """
+    data_path = Path(data_path)
+    key_source = '|'.join(map(str, (
+        SPLIT_CACHE_VERSION, sorted(UNUSED_COLUMNS), sorted(TEXT_COLUMNS),
+        data_path.resolve(), data_path.stat().st_mtime_ns, target_col, test_size
+    )))
+    key = hashlib.sha1(key_source.encode('utf-8')).hexdigest()[:16]
+    split_dir = Path(cache_dir) / f"{data_path.stem}_{key}"
+    
+    if split_dir.is_dir() and all((split_dir / f'{name}.npy').exists() for name in SPLIT_ARRAYS):
+        logger.info(f"  Using cached split: {split_dir}")
+        return {
+            name: np.load(split_dir / f'{name}.npy', mmap_mode='r', allow_pickle=False)
+            for name in SPLIT_ARRAYS
+        }
+    
+    df = load_df() if load_df is not None else pd.read_csv(data_path)
+    split = _split_and_scale(df, target_col, test_size)
+    
+    # Write to a temporary directory first so a crashed run never leaves a partial cache
+    split_dir.parent.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=split_dir.parent, prefix=f'.{split_dir.name}_'))
+    for name in SPLIT_ARRAYS:
+        np.save(tmp_dir / f'{name}.npy', split[name], allow_pickle=False)
+    try:
+        tmp_dir.rename(split_dir)
+        logger.info(f"  Cached split to: {split_dir}")
+    except OSError:
+        # Another process cached the same split first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+    
+    return split
+
+
+# Eager signatures: the kernel is compiled (or loaded from the on-disk cache) at import,
+# so neither the first evaluate_model call nor forked training workers pay JIT latency.
+# Serial on purpose: a parallel kernel would start Numba's threading layer at import,
+# which deadlocks the ProcessPoolExecutor workers forked later in main().
+# y_true may be a read-only memmap from the split cache.
+_FUSED_METRICS_SIGNATURES = [
+    types.Tuple((types.float64,) * 5 + (types.int64,) * 2)(
+        types.Array(types.float32, 1, 'C', readonly=readonly),
+        types.Array(types.float32, 1, 'C'),
+        types.Array(types.int8, 1, 'C')
+    )
+    for readonly in (False, True)
+]
+
+
+@njit(_FUSED_METRICS_SIGNATURES, fastmath=True, cache=True)
+def _fused_metrics(y_true, y_pred, sign_true):
+    """
+    Single pass over y_true/y_pred accumulating every sum evaluate_model needs
+    
+    sign_true is the precomputed int8 sign of y_true, so only the prediction's
+    sign is derived inside the loop.
+    
+    Returns:
+        (sum_sq_err, sum_abs_err, sum_true, sum_true_sq,
+         sum_abs_pct_err, nonzero_count, dir_correct)
+    """
+    sum_sq_err = 0.0
+    sum_abs_err = 0.0
+    sum_true = 0.0
+    sum_true_sq = 0.0
+    sum_abs_pct_err = 0.0
+    nonzero_count = 0
+    dir_correct = 0
+    
+    for i in range(y_true.shape[0]):
+        t = np.float64(y_true[i])
+        p = np.float64(y_pred[i])
+        err = t - p
+        
+        sum_sq_err += err * err
+        sum_abs_err += abs(err)
+        sum_true += t
+        sum_true_sq += t * t
+        
+        # Branchless masked MAPE term: zero targets divide by 1 and contribute 0
+        nonzero = t != 0.0
+        sum_abs_pct_err += abs(err / (t + (not nonzero))) * nonzero
+        nonzero_count += nonzero
+        
+        sign_pred = (p > 0.0) - (p < 0.0)
+        if sign_pred == sign_true[i]:
+            dir_correct += 1
+    
+    return (sum_sq_err, sum_abs_err, sum_true, sum_true_sq,
+            sum_abs_pct_err, nonzero_count, dir_correct)
+
+
 class StockModelTrainer:
     """
     Train and evaluate multiple ML models for stock return prediction
     """
     
-    def __init__(self, data_path: str, target_col: str = 'target_return'):
+    def __init__(self, data_path: str, target_col: str = 'target_return', n_jobs: int = None):
         """
         Initialize trainer
         
         Args:
             data_path: Path to features CSV file
             target_col: Name of target column
+            n_jobs: Threads per model for the default parameter sets (default: all cores)
         """
         self.data_path = Path(data_path)
         self.target_col = target_col
+        self.n_jobs = n_jobs or os.cpu_count() or 1
         self.df = None
         self.X_train = None
         self.X_test = None
@@ -58,14 +335,39 @@ class StockModelTrainer:
         self.test_dates = None
         self.train_symbols = None
         self.test_symbols = None
-        self.scaler = StandardScaler()
+        self.scaler_mean = None
+        self.scaler_std = None
+        self._sign_y_train = None
+        self._sign_y_test = None
         self.feature_names = []
         self.results = []
         
     def load_data(self):
         """Load and prepare data"""
         logger.info(f"Loading data from: {self.data_path}")
-        self.df = pd.read_csv(self.data_path)
+        
+        # Raw price/volume columns are never model features, so don't parse them;
+        # numeric columns are parsed block by block straight into float32 and
+        # 'time' straight into datetime64 (no second to_datetime pass)
+        with open(self.data_path, newline='', encoding='utf-8-sig') as f:
+            header = next(csv.reader(f))
+        columns = [c for c in header if c not in UNUSED_COLUMNS]
+        table = pacsv.read_csv(
+            self.data_path,
+            read_options=pacsv.ReadOptions(use_threads=True, block_size=16 << 20),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=columns,
+                column_types={
+                    **{c: pa.float32() for c in columns if c not in TEXT_COLUMNS},
+                    'time': pa.timestamp('ns')
+                }
+            )
+        )
+        self.df = table.to_pandas(split_blocks=True, self_destruct=True)
+        del table
+        if not self.df['time'].is_monotonic_increasing:
+            self.df.sort_values('time', inplace=True, kind='stable')
+        
         logger.info(f"  Loaded: {self.df.shape}")
         logger.info(f"  Columns: {self.df.shape[1]}")
         logger.info(f"  Date range: {self.df['time'].min()} to {self.df['time'].max()}")
@@ -76,74 +378,49 @@ class StockModelTrainer:
         
         return self
     
-    def prepare_train_test_split(self, test_size: float = 0.2):
+    def prepare_train_test_split(self, test_size: float = 0.2, cache_dir: str = 'data/cache'):
         """
         Time-series split: Last 20% as test set
         
+        Reuses a cached split for the same CSV/target/test_size when one exists,
+        so the CSV is only parsed (via load_data) on a cache miss.
+        
         Args:
             test_size: Fraction of data for testing
+            cache_dir: Directory holding cached splits
         """
         logger.info(f"\nPreparing train/test split (test_size={test_size})...")
         
-        # Sort by time
-        self.df = self.df.sort_values('time')
-        
-        # Identify metadata columns
-        metadata_cols = ['symbol', 'date', 'time', 'open', 'high', 'low', 'close', 'volume']
-        
-        # Feature columns = all except metadata and target
-        feature_cols = [c for c in self.df.columns 
-                       if c not in metadata_cols and c != self.target_col]
-        
-        self.feature_names = feature_cols
-        logger.info(f"  Using {len(feature_cols)} features")
-        
-        # Remove rows with NaN in target
-        df_clean = self.df.dropna(subset=[self.target_col])
-        logger.info(f"  After removing NaN targets: {len(df_clean)} rows")
-        
-        # Time-based split
-        split_idx = int(len(df_clean) * (1 - test_size))
-        
-        train_df = df_clean.iloc[:split_idx]
-        test_df = df_clean.iloc[split_idx:]
-        
-        logger.info(f"  Train: {len(train_df)} rows ({train_df['time'].min()} to {train_df['time'].max()})")
-        logger.info(f"  Test:  {len(test_df)} rows ({test_df['time'].min()} to {test_df['time'].max()})")
-        
-        # Extract features and target
-        self.X_train = train_df[feature_cols]
-        self.y_train = train_df[self.target_col]
-        self.train_dates = train_df['time']
-        self.train_symbols = train_df['symbol']
-        
-        self.X_test = test_df[feature_cols]
-        self.y_test = test_df[self.target_col]
-        self.test_dates = test_df['time']
-        self.test_symbols = test_df['symbol']
-        
-        # Handle remaining NaN in features (forward fill then backward fill)
-        self.X_train = self.X_train.fillna(method='ffill').fillna(method='bfill').fillna(0)
-        self.X_test = self.X_test.fillna(method='ffill').fillna(method='bfill').fillna(0)
-        
-        # Scale features
-        logger.info("  Scaling features...")
-        self.X_train = pd.DataFrame(
-            self.scaler.fit_transform(self.X_train),
-            columns=feature_cols,
-            index=self.X_train.index
-        )
-        self.X_test = pd.DataFrame(
-            self.scaler.transform(self.X_test),
-            columns=feature_cols,
-            index=self.X_test.index
+        split = build_or_load_split(
+            self.data_path,
+            target_col=self.target_col,
+            test_size=test_size,
+            cache_dir=cache_dir,
+            load_df=lambda: self.df if self.df is not None else self.load_data().df
         )
         
+        self.feature_names = list(split['feature_names'])
+        self.X_train = split['X_train']
+        self.X_test = split['X_test']
+        self.y_train = split['y_train']
+        self.y_test = split['y_test']
+        self.train_dates = split['train_dates']
+        self.test_dates = split['test_dates']
+        self.train_symbols = split['train_symbols']
+        self.test_symbols = split['test_symbols']
+        self.scaler_mean = split['scaler_mean']
+        self.scaler_std = split['scaler_std']
+        
+        # Target signs never change, so compute them once for every evaluate_model call
+        self._sign_y_train = np.sign(self.y_train).astype(np.int8)
+        self._sign_y_test = np.sign(self.y_test).astype(np.int8)
+        
         logger.info("✅ Train/test split complete")
         
         return self
     
-    def evaluate_model(self, y_true, y_pred, dataset_name: str = 'Test') -> dict:
+    def evaluate_model(self, y_true, y_pred, dataset_name: str = 'Test',
+                       sign_y_true: np.ndarray = None) -> dict:
         """
         Calculate comprehensive evaluation metrics
         
@@ -151,24 +428,31 @@ class StockModelTrainer:
             y_true: True values
             y_pred: Predicted values
             dataset_name: Name of dataset (Train/Test)
+            sign_y_true: Cached int8 sign of y_true (computed here if None)
             
         Returns:
             Dictionary of metrics
         """
-        mse = mean_squared_error(y_true, y_pred)
+        y_true = np.ascontiguousarray(y_true, dtype=np.float32)
+        y_pred = np.ascontiguousarray(y_pred, dtype=np.float32)
+        if sign_y_true is None:
+            sign_y_true = np.sign(y_true).astype(np.int8)
+        
+        (sum_sq_err, sum_abs_err, sum_true, sum_true_sq,
+         sum_abs_pct_err, nonzero_count, dir_correct) = _fused_metrics(y_true, y_pred, sign_y_true)
+        
+        n = len(y_true)
+        mse = sum_sq_err / n
         rmse = np.sqrt(mse)
-        mae = mean_absolute_error(y_true, y_pred)
-        r2 = r2_score(y_true, y_pred)
+        mae = sum_abs_err / n
+        ss_tot = sum_true_sq - sum_true * sum_true / n
+        r2 = 1.0 - sum_sq_err / ss_tot if ss_tot > 0 else 0.0
         
-        # Mean Absolute Percentage Error (MAPE)
-        # Handle zeros in y_true
-        mask = y_true != 0
-        mape = np.mean(np.abs((y_true[mask] - y_pred[mask]) / y_true[mask])) * 100 if mask.sum() > 0 else np.inf
+        # Mean Absolute Percentage Error (MAPE), skipping zeros in y_true
+        mape = sum_abs_pct_err / nonzero_count * 100 if nonzero_count > 0 else np.inf
         
         # Directional Accuracy
-        direction_true = np.sign(y_true)
-        direction_pred = np.sign(y_pred)
-        directional_accuracy = np.mean(direction_true == direction_pred) * 100
+        directional_accuracy = dir_correct / n * 100
         
         return {
             f'{dataset_name}_MSE': mse,
@@ -179,12 +463,21 @@ class StockModelTrainer:
             f'{dataset_name}_DirectionalAccuracy': directional_accuracy
         }
     
-    def train_xgboost(self, params: dict = None):
+    def _train_metrics(self, predict, full: bool = False) -> dict:
+        """Train_* metrics from predict(X) on every TRAIN_METRICS_STRIDE-th train row, or all rows if full"""
+        rows = slice(None) if full else slice(None, None, TRAIN_METRICS_STRIDE)
+        return self.evaluate_model(
+            self.y_train[rows], predict(self.X_train[rows]), 'Train',
+            sign_y_true=np.ascontiguousarray(self._sign_y_train[rows])
+        )
+    
+    def train_xgboost(self, params: dict = None, compute_train_metrics: bool = False):
         """
         Train XGBoost model
         
         Args:
             params: Hyperparameters (if None, use defaults)
+            compute_train_metrics: Evaluate Train_* on the whole train set instead of a subsample
         """
         logger.info("\n" + "="*80)
         logger.info("TRAINING XGBOOST")
@@ -203,34 +496,61 @@ class StockModelTrainer:
                 'reg_alpha': 0.1,
                 'reg_lambda': 1.0,
                 'random_state': 42,
-                'n_jobs': -1,
+                'n_jobs': self.n_jobs,
                 'early_stopping_rounds': 50
             }
+        params = dict(params)
+        
+        # Histogram tree construction, on the GPU when one is available
+        params.setdefault('tree_method', 'hist')
+        params.setdefault('device', 'cuda' if _cuda_available() else 'cpu')
+        params.setdefault('max_bin', 256)
         
         logger.info(f"Parameters: {params}")
         
         # Separate early stopping params
         early_stopping_rounds = params.pop('early_stopping_rounds', None)
         
-        # Train
-        model = xgb.XGBRegressor(**params)
+        # Build each DMatrix once and share it between training, evaluation and predict
+        nthread = params.pop('n_jobs', self.n_jobs)
+        dtrain = xgb.DMatrix(self.X_train, label=self.y_train,
+                             feature_names=list(self.feature_names), nthread=nthread)
+        dtest = xgb.DMatrix(self.X_test, label=self.y_test,
+                            feature_names=list(self.feature_names), nthread=nthread)
         
-        if early_stopping_rounds:
-            model.fit(
-                self.X_train, self.y_train,
-                eval_set=[(self.X_test, self.y_test)],
-                verbose=False
-            )
-        else:
-            model.fit(self.X_train, self.y_train)
+        # Translate the sklearn-style names to the native training API
+        num_boost_round = params.pop('n_estimators', 100)
+        if 'random_state' in params:
+            params['seed'] = params.pop('random_state')
+        params['nthread'] = nthread
+        
+        # Train
+        model = xgb.train(
+            params,
+            dtrain,
+            num_boost_round=num_boost_round,
+            evals=[(dtest, 'test')] if early_stopping_rounds else (),
+            early_stopping_rounds=early_stopping_rounds,
+            verbose_eval=False
+        )
+        best_rounds = (model.best_iteration + 1) if early_stopping_rounds else num_boost_round
+        logger.info(f"  Stopped at {best_rounds}/{num_boost_round} rounds")
         
         # Predict
-        y_train_pred = model.predict(self.X_train)
-        y_test_pred = model.predict(self.X_test)
+        y_test_pred = model.predict(dtest, iteration_range=(0, best_rounds))
         
         # Evaluate
-        train_metrics = self.evaluate_model(self.y_train, y_train_pred, 'Train')
-        test_metrics = self.evaluate_model(self.y_test, y_test_pred, 'Test')
+        train_metrics = self._train_metrics(
+            lambda X: model.predict(
+                dtrain if compute_train_metrics
+                else xgb.DMatrix(X, feature_names=list(self.feature_names), nthread=nthread),
+                iteration_range=(0, best_rounds)
+            ),
+            full=compute_train_metrics
+        )
+        test_metrics = self.evaluate_model(
+            self.y_test, y_test_pred, 'Test', sign_y_true=self._sign_y_test
+        )
         
         metrics = {
             'Model': 'XGBoost',
@@ -254,12 +574,13 @@ class StockModelTrainer:
         
         return model, metrics
     
-    def train_catboost(self, params: dict = None):
+    def train_catboost(self, params: dict = None, compute_train_metrics: bool = False):
         """
         Train CatBoost model
         
         Args:
             params: Hyperparameters (if None, use defaults)
+            compute_train_metrics: Evaluate Train_* on the whole train set instead of a subsample
         """
         logger.info("\n" + "="*80)
         logger.info("TRAINING CATBOOST")
@@ -275,28 +596,50 @@ class StockModelTrainer:
                 'random_strength': 0.5,
                 'bagging_temperature': 0.5,
                 'random_seed': 42,
+                'thread_count': self.n_jobs,
                 'verbose': False,
                 'early_stopping_rounds': 50
             }
+        params = dict(params)
         
         logger.info(f"Parameters: {params}")
         
+        # Build pools straight from the float32 arrays
+        train_pool = Pool(
+            data=self.X_train,
+            label=self.y_train,
+            feature_names=list(self.feature_names)
+        )
+        eval_pool = Pool(
+            data=self.X_test,
+            label=self.y_test,
+            feature_names=list(self.feature_names)
+        )
+        
+        if _cuda_available():
+            params.setdefault('task_type', 'GPU')
+        
         # Train
         model = CatBoostRegressor(**params)
         
         model.fit(
-            self.X_train, self.y_train,
-            eval_set=(self.X_test, self.y_test),
+            train_pool,
+            eval_set=eval_pool,
             verbose=False
         )
+        logger.info(f"  Stopped at {model.tree_count_}/{params.get('iterations', 1000)} iterations")
         
         # Predict
-        y_train_pred = model.predict(self.X_train)
-        y_test_pred = model.predict(self.X_test)
+        y_test_pred = model.predict(eval_pool)
         
         # Evaluate
-        train_metrics = self.evaluate_model(self.y_train, y_train_pred, 'Train')
-        test_metrics = self.evaluate_model(self.y_test, y_test_pred, 'Test')
+        train_metrics = self._train_metrics(
+            lambda X: model.predict(train_pool if compute_train_metrics else X),
+            full=compute_train_metrics
+        )
+        test_metrics = self.evaluate_model(
+            self.y_test, y_test_pred, 'Test', sign_y_true=self._sign_y_test
+        )
         
         metrics = {
             'Model': 'CatBoost',
@@ -320,12 +663,13 @@ class StockModelTrainer:
         
         return model, metrics
     
-    def train_randomforest(self, params: dict = None):
+    def train_randomforest(self, params: dict = None, compute_train_metrics: bool = False):
         """
         Train Random Forest model
         
         Args:
             params: Hyperparameters (if None, use defaults)
+            compute_train_metrics: Evaluate Train_* on the whole train set instead of a subsample
         """
         logger.info("\n" + "="*80)
         logger.info("TRAINING RANDOM FOREST")
@@ -339,22 +683,61 @@ class StockModelTrainer:
                 'min_samples_leaf': 10,
                 'max_features': 'sqrt',
                 'random_state': 42,
-                'n_jobs': -1
+                'n_jobs': self.n_jobs,
+                'oob_batch_size': 50,
+                'oob_patience': 3,
+                'oob_min_estimators': 150
             }
         
         logger.info(f"Parameters: {params}")
         
-        # Train
-        model = RandomForestRegressor(**params)
-        model.fit(self.X_train, self.y_train)
+        # Separate early stopping params (n_estimators becomes the tree cap)
+        params = dict(params)
+        batch_size = params.pop('oob_batch_size', 50)
+        patience = params.pop('oob_patience', 3)
+        max_trees = params.pop('n_estimators', 300)
+        min_trees = min(params.pop('oob_min_estimators', 150), max_trees)
+        # OOB early stopping needs these fixed, whatever the caller passed
+        for key in ('bootstrap', 'oob_score', 'warm_start'):
+            params.pop(key, None)
+        
+        # Train: grow the forest in batches, stop once OOB error stops improving
+        model = RandomForestRegressor(
+            **params,
+            n_estimators=min(batch_size, max_trees),
+            bootstrap=True,
+            oob_score=True,
+            warm_start=True
+        )
+        
+        best_oob_mse = np.inf
+        stale_batches = 0
+        while True:
+            model.fit(self.X_train, self.y_train)
+            oob_mse = float(np.mean((self.y_train - model.oob_prediction_) ** 2))
+            
+            if oob_mse < best_oob_mse:
+                best_oob_mse = oob_mse
+                stale_batches = 0
+            else:
+                stale_batches += 1
+            
+            if model.n_estimators >= max_trees:
+                break
+            if stale_batches >= patience and model.n_estimators >= min_trees:
+                break
+            model.n_estimators = min(model.n_estimators + batch_size, max_trees)
+        
+        logger.info(f"  Stopped at {model.n_estimators} trees (OOB MSE: {best_oob_mse:.6f})")
         
         # Predict
-        y_train_pred = model.predict(self.X_train)
         y_test_pred = model.predict(self.X_test)
         
         # Evaluate
-        train_metrics = self.evaluate_model(self.y_train, y_train_pred, 'Train')
-        test_metrics = self.evaluate_model(self.y_test, y_test_pred, 'Test')
+        train_metrics = self._train_metrics(model.predict, full=compute_train_metrics)
+        test_metrics = self.evaluate_model(
+            self.y_test, y_test_pred, 'Test', sign_y_true=self._sign_y_test
+        )
         
         metrics = {
             'Model': 'RandomForest',
@@ -378,12 +761,13 @@ class StockModelTrainer:
         
         return model, metrics
     
-    def train_lightgbm(self, params: dict = None):
+    def train_lightgbm(self, params: dict = None, compute_train_metrics: bool = False):
         """
         Train LightGBM model
         
         Args:
             params: Hyperparameters (if None, use defaults)
+            compute_train_metrics: Evaluate Train_* on the whole train set instead of a subsample
         """
         logger.info("\n" + "="*80)
         logger.info("TRAINING LIGHTGBM")
@@ -404,7 +788,7 @@ class StockModelTrainer:
                 'reg_alpha': 0.1,
                 'reg_lambda': 1.0,
                 'random_state': 42,
-                'n_jobs': -1,
+                'n_jobs': self.n_jobs,
                 'verbose': -1
             }
         
@@ -416,16 +800,18 @@ class StockModelTrainer:
         model.fit(
             self.X_train, self.y_train,
             eval_set=[(self.X_test, self.y_test)],
-            callbacks=[lgb.early_stopping(50), lgb.log_evaluation(0)]
+            callbacks=[lgb.early_stopping(50, verbose=False), lgb.log_evaluation(0)]
         )
+        logger.info(f"  Stopped at {model.best_iteration_ or model.n_estimators}/{model.n_estimators} rounds")
         
         # Predict
-        y_train_pred = model.predict(self.X_train)
         y_test_pred = model.predict(self.X_test)
         
         # Evaluate
-        train_metrics = self.evaluate_model(self.y_train, y_train_pred, 'Train')
-        test_metrics = self.evaluate_model(self.y_test, y_test_pred, 'Test')
+        train_metrics = self._train_metrics(model.predict, full=compute_train_metrics)
+        test_metrics = self.evaluate_model(
+            self.y_test, y_test_pred, 'Test', sign_y_true=self._sign_y_test
+        )
         
         metrics = {
             'Model': 'LightGBM',
@@ -449,14 +835,76 @@ class StockModelTrainer:
         
         return model, metrics
     
+    def tune(self, n_iter: int = 100) -> dict:
+        """
+        Randomized hyperparameter search for XGBoost on time-series folds
+        
+        Reuses the already prepared (scaled) train arrays, so exploring parameters
+        does not re-run data loading or the split.
+        
+        Args:
+            n_iter: Number of sampled parameter combinations
+            
+        Returns:
+            Best parameters, ready for train_xgboost(params=...)
+        """
+        logger.info("\n" + "="*80)
+        logger.info("HYPERPARAMETER TUNING - XGBOOST")
+        logger.info("="*80)
+        
+        base_params = {
+            'objective': 'reg:squarederror',
+            'tree_method': 'hist',
+            'n_estimators': 300,
+            'random_state': 42
+        }
+        param_distributions = {
+            'max_depth': randint(3, 8),
+            'learning_rate': loguniform(1e-3, 0.2),
+            'subsample': uniform(0.5, 0.5),
+            'colsample_bytree': uniform(0.5, 0.5),
+            'reg_alpha': loguniform(0.01, 10),
+            'reg_lambda': loguniform(0.01, 10)
+        }
+        
+        # Single-threaded candidates; the search parallelizes across them
+        search = RandomizedSearchCV(
+            estimator=xgb.XGBRegressor(**base_params, n_jobs=1),
+            param_distributions=param_distributions,
+            n_iter=n_iter,
+            cv=TimeSeriesSplit(n_splits=5),
+            scoring='r2',
+            n_jobs=self.n_jobs,
+            refit=False,
+            verbose=1,
+            random_state=42
+        )
+        
+        logger.info(f"Starting randomized search ({n_iter} iterations)...")
+        search.fit(self.X_train, self.y_train)
+        
+        logger.info("✅ Randomized search complete!")
+        logger.info(f"   Best params: {search.best_params_}")
+        logger.info(f"   Best CV score (R²): {search.best_score_:.6f}")
+        
+        return {
+            **base_params,
+            **search.best_params_,
+            'n_jobs': self.n_jobs,
+            'early_stopping_rounds': 50
+        }
+    
     def _log_feature_importance(self, model, model_name: str, top_n: int = 20):
         """Log top N most important features"""
-        logger.info(f"\n🔍 Top {top_n} Important Features ({model_name}):")
-        
         if hasattr(model, 'feature_importances_'):
             importance = model.feature_importances_
         elif hasattr(model, 'get_feature_importance'):
             importance = model.get_feature_importance()
+        elif isinstance(model, xgb.Booster):
+            # Native booster: average gain per feature, normalized like XGBRegressor
+            scores = model.get_score(importance_type='gain')
+            importance = np.array([scores.get(f, 0.0) for f in self.feature_names])
+            importance = importance / importance.sum() if importance.sum() > 0 else importance
         else:
             logger.warning("  Feature importance not available")
             return
@@ -465,11 +913,12 @@ class StockModelTrainer:
         importance_df = pd.DataFrame({
             'feature': self.feature_names,
             'importance': importance
-        }).sort_values('importance', ascending=False)
+        }).nlargest(top_n, 'importance')
         
-        # Log top N
-        for idx, row in importance_df.head(top_n).iterrows():
-            logger.info(f"  {row['feature']:50s} : {row['importance']:.4f}")
+        # Log top N as a single record
+        lines = [f"  {feature:50s} : {imp:.4f}"
+                 for feature, imp in importance_df.itertuples(index=False)]
+        logger.info(f"\n🔍 Top {top_n} Important Features ({model_name}):\n" + '\n'.join(lines))
     
     def save_results(self, output_dir: str = 'results'):
         """Save all results to CSV"""
@@ -522,6 +971,39 @@ class StockModelTrainer:
         logger.info(f"   Directional Accuracy: {best_model['Test_DirectionalAccuracy']:.2f}%")
 
 
+MODEL_TRAINERS = [
+    ('XGBoost', 'train_xgboost'),
+    ('CatBoost', 'train_catboost'),
+    ('RandomForest', 'train_randomforest'),
+    ('LightGBM', 'train_lightgbm'),
+]
+
+
+def train_one(method_name: str, data_path: str, target_col: str, test_size: float,
+              cache_dir: str, n_jobs: int) -> dict:
+    """
+    Train one model in a worker process
+    
+    The worker reopens the cached split memory-mapped, so the arrays are shared with
+    the parent process rather than pickled into every worker.
+    
+    Args:
+        method_name: StockModelTrainer method to call (see MODEL_TRAINERS)
+        data_path: Path to features CSV file
+        target_col: Name of target column
+        test_size: Fraction of data for testing
+        cache_dir: Directory holding cached splits
+        n_jobs: Threads for this model
+        
+    Returns:
+        Metrics dictionary of the trained model
+    """
+    trainer = StockModelTrainer(data_path, target_col, n_jobs=n_jobs)
+    trainer.prepare_train_test_split(test_size=test_size, cache_dir=cache_dir)
+    _, metrics = getattr(trainer, method_name)()
+    return metrics
+
+
 def main():
     """
     Main execution: Train all models and compare
@@ -536,32 +1018,28 @@ def main():
         target_col='target_return'
     )
     
-    # Load and prepare data
-    trainer.load_data()
+    # Prepare data (the CSV is only loaded if no cached split exists)
     trainer.prepare_train_test_split(test_size=0.2)
     
-    # Train all models
+    # Train all models (independent, so run them in parallel worker processes)
     logger.info("\n🚀 Starting model training...")
     
-    try:
-        trainer.train_xgboost()
-    except Exception as e:
-        logger.error(f"XGBoost training failed: {e}")
-    
-    try:
-        trainer.train_catboost()
-    except Exception as e:
-        logger.error(f"CatBoost training failed: {e}")
+    n_workers = 2
+    n_jobs = max(1, (os.cpu_count() or 1) // n_workers)
     
-    try:
-        trainer.train_randomforest()
-    except Exception as e:
-        logger.error(f"RandomForest training failed: {e}")
-    
-    try:
-        trainer.train_lightgbm()
-    except Exception as e:
-        logger.error(f"LightGBM training failed: {e}")
+    with ProcessPoolExecutor(max_workers=n_workers) as executor:
+        futures = {
+            executor.submit(
+                train_one, method_name, str(trainer.data_path), trainer.target_col,
+                0.2, 'data/cache', n_jobs
+            ): model_name
+            for model_name, method_name in MODEL_TRAINERS
+        }
+        for future in as_completed(futures):
+            try:
+                trainer.results.append(future.result())
+            except Exception as e:
+                logger.error(f"{futures[future]} training failed: {e}", exc_info=True)
     
     # Compare models
     trainer.compare_models()
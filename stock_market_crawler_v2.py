@@ -4,16 +4,30 @@ Cào TẤT CẢ tin tức về "chứng khoán" từ VnExpress (date_format=all)
 Lọc những bài có nhắc đến FPT hoặc BID/BIDV
 """
 
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+# Needed to decode 'br' responses (httpx picks it up); fails fast at start-up if missing
+import brotli  # noqa: F401
+import httpx
+import hishel
+from hishel.httpx import AsyncCacheTransport
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve
+from selectolax.lexbor import LexborHTMLParser
+import ahocorasick
+from pybloom_live import ScalableBloomFilter
+import xxhash
 import csv
-from datetime import datetime
+from datetime import datetime, timedelta
 import time
 import sys
 import re
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from threading import Lock
+import html as htmllib
+import bisect
+import itertools
+import gzip
 import os
+from urllib.parse import urljoin
+from concurrent.futures import ProcessPoolExecutor
 
 # ============= CONFIGURATION =============
 # SEARCH_KEYWORDS = [
@@ -80,203 +94,266 @@ START_DATE = datetime(2015, 1, 1)
 END_DATE = datetime(2025, 10, 30)
 
 MAX_WORKERS = 8
+PARSE_WORKERS = os.cpu_count() or 1  # Processes for HTML parsing (the event loop only does I/O)
 BATCH_SIZE = 100
-REQUEST_DELAY = 0.2
+MATCH_BATCH_SIZE = 1000  # Articles per batched ticker scan
+CSV_FIELDS = ["date", "title", "content", "tickers", "source"]
+REQUESTS_PER_SECOND = 15  # Token-bucket budget per host (listing + article requests)
 
-# Thread-safe
-csv_lock = Lock()
-seen_urls = set()
-stats_lock = Lock()
+# Listing pages: only materialize the nodes that carry article links
+# (strainers see the raw class attribute, so match one class among several)
+VNEXPRESS_LISTING_STRAINER = SoupStrainer('h3', class_=re.compile(r'(?:^|\s)title-news(?:\s|$)'))
+DANTRI_LISTING_STRAINER = SoupStrainer(['h3', 'h4', 'a'], class_=re.compile(r'(?:^|\s)article-title(?:\s|$)'))
+CAFEF_LISTING_STRAINER = SoupStrainer('a', href=re.compile(r'\.chn'))
+DANTRI_LINK_SELECTOR = soupsieve.compile("h3.article-title a, h4.article-title a, a.article-title")
+
+# Listing fast path: pull hrefs straight from the raw bytes (the parsers above are the fallback)
+VNEXPRESS_LINK_RE = re.compile(rb'<h3\s[^>]*\bclass="(?:[^"]*\s)?title-news(?:\s[^"]*)?"[^>]*>\s*<a\s[^>]*?\bhref="([^"]*)"')
+CAFEF_LINK_RE = re.compile(rb'<a\s[^>]*?\bhref="([^"]*\.chn[^"]*)"')
+
+def _decode_href(raw):
+    return htmllib.unescape(raw.decode('utf-8', 'replace'))
+
+# Listing pages fetched concurrently per source
+LISTING_WINDOW = 4
+
+# VnExpress discovery through robots.txt sitemaps (falls back to search pagination if empty)
+USE_SITEMAPS = True
+VNEXPRESS_ROBOTS_URL = "https://vnexpress.net/robots.txt"
+SITEMAP_SECTIONS = ("kinh-doanh", "chung-khoan")
+
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept-Encoding': 'gzip, deflate, br',
+}
+
+# On-disk response cache: article pages are re-read from SQLite on later runs.
+# Search listings and sitemaps are never cached since they change between runs.
+RESPONSE_CACHE_PATH = "crawl_cache.sqlite"
+RESPONSE_CACHE_TTL = timedelta(days=30).total_seconds()
+LISTING_URL_MARKERS = ("timkiem.", "/tim-kiem", "sitemap", "robots.txt")
+
+class ArticlePageFilter(hishel.BaseFilter):
+    def needs_body(self):
+        return False
+    
+    def apply(self, item, body):
+        url = str(item.url)
+        return not any(marker in url for marker in LISTING_URL_MARKERS)
+
+class OkResponseFilter(hishel.BaseFilter):
+    def needs_body(self):
+        return False
+    
+    def apply(self, item, body):
+        return item.status_code == 200
+
+def create_cache_transport(next_transport):
+    """Wrap an httpx transport with the SQLite article cache"""
+    return AsyncCacheTransport(
+        next_transport=next_transport,
+        storage=hishel.AsyncSqliteStorage(database_path=RESPONSE_CACHE_PATH, default_ttl=RESPONSE_CACHE_TTL),
+        policy=hishel.FilterPolicy(request_filters=[ArticlePageFilter()], response_filters=[OkResponseFilter()])
+    )
+
+# Shared state below is only touched from the event loop thread, so no locks are needed
+seen_urls = ScalableBloomFilter(initial_capacity=1_000_000, error_rate=1e-6)  # ~4 bytes per URL instead of the full string
 
 # Statistics
 total_articles_found = 0
 total_articles_with_tickers = 0
 
 # ============= HELPER FUNCTIONS =============
+TICKER_LITERALS = {
+    "FPT": [
+        "FPT",
+        "CỔ PHIẾU FPT",
+        "FPT CORPORATION",
+        "TẬP ĐOÀN FPT",
+        "(FPT)",
+    ],
+    "BID": [
+        "BID",
+        "BIDV",
+        "CỔ PHIẾU BID",
+        "CỔ PHIẾU BIDV",
+        "NGÂN HÀNG BIDV",
+        "ĐẦU TƯ VÀ PHÁT TRIỂN",
+        "(BID)",
+        "(BIDV)",
+    ],
+}
+
+# Bare symbols only count as whole words (the old \bFPT\b, \bBID\b, \bBIDV\b)
+WHOLE_WORD_LITERALS = {"FPT", "BID", "BIDV"}
+
+# Raw-bytes prefilter run before parsing: every TICKER_LITERALS hit contains FPT, BID or
+# TRIỂN once uppercased, so pages (UTF-8) without any of them cannot match
+TICKER_PREFILTER_RE = re.compile(rb'fpt|bid|tri\xe1\xbb[\x82\x83]n', re.IGNORECASE)
+
+def _build_ticker_automaton():
+    """Build one Aho-Corasick automaton over all ticker literals"""
+    automaton = ahocorasick.Automaton()
+    for ticker, literals in TICKER_LITERALS.items():
+        for literal in literals:
+            automaton.add_word(literal, (ticker, len(literal), literal in WHOLE_WORD_LITERALS))
+    automaton.make_automaton()
+    return automaton
+
+TICKER_AUTOMATON = _build_ticker_automaton()
+
+# Joins texts for a batched scan: not a word char and in no literal, so hits never span two texts
+TEXT_SEPARATOR = '\x00'
+
+def _is_word_char(ch):
+    r"""re's \w test for the \b check (Vietnamese letters included); False for an empty edge slice"""
+    return ch.isalnum() or ch == '_'
+
+def match_tickers_batch(texts):
+    """
+    Find FPT/BID mentions in many texts with a single Aho-Corasick pass
+    
+    Returns the matched tickers of each text, in TICKER_LITERALS order.
+    """
+    texts_upper = [text.upper() if text else "" for text in texts]
+    buffer = TEXT_SEPARATOR.join(texts_upper)
+    starts = list(itertools.accumulate((len(t) + 1 for t in texts_upper[:-1]), initial=0))
+    
+    found = [set() for _ in texts_upper]
+    for end, (ticker, length, whole_word) in TICKER_AUTOMATON.iter(buffer):
+        start = end - length + 1
+        if whole_word and (_is_word_char(buffer[start - 1:start]) or _is_word_char(buffer[end + 1:end + 2])):
+            continue
+        found[bisect.bisect_right(starts, start) - 1].add(ticker)
+    
+    return [[ticker for ticker in TICKER_LITERALS if ticker in tickers] for tickers in found]
+
 def contains_target_ticker(text):
     """Check if text mentions FPT, BID, or BIDV"""
     if not text:
         return False, []
     
-    text_upper = text.upper()
-    matched = []
-    
-    ticker_patterns = {
-        "FPT": [
-            r'\bFPT\b',
-            r'CỔ PHIẾU FPT',
-            r'FPT CORPORATION',
-            r'TẬP ĐOÀN FPT',
-            r'\(FPT\)',
-        ],
-        "BID": [
-            r'\bBID\b',
-            r'\bBIDV\b',
-            r'CỔ PHIẾU BID',
-            r'CỔ PHIẾU BIDV',
-            r'NGÂN HÀNG BIDV',
-            r'ĐẦU TƯ VÀ PHÁT TRIỂN',
-            r'\(BID\)',
-            r'\(BIDV\)',
-        ],
-    }
-    
-    for ticker, patterns in ticker_patterns.items():
-        for pattern in patterns:
-            if re.search(pattern, text_upper):
-                if ticker not in matched:
-                    matched.append(ticker)
-                break
-    
+    matched = match_tickers_batch([text])[0]
     return len(matched) > 0, matched
 
-def parse_date(date_str):
-    """Parse date to ISO format (chỉ ngày tháng năm, không có thứ)"""
+DAY_OF_WEEK_RE = re.compile(r'(Thứ\s+\d+|Chủ\s+nhật|Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)[,\s]*', re.IGNORECASE)
+# Every DAY_OF_WEEK_RE match contains one of these (lowercased), so strings without them skip the regex
+DAY_OF_WEEK_MARKERS = ('thứ', 'chủ', 'day')
+ISO_DATETIME_RE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2}) (\d{1,2}):(\d{2}):(\d{2})')
+DMY_DATE_RE = re.compile(r'(?:(\d{1,2}):(\d{2})[\s,-]+)?(\d{1,2})([/-])(\d{1,2})\4(\d{4})(?:[\s,-]+(\d{1,2}):(\d{2}))?')
+
+def parse_date_once(date_str):
+    """
+    Parse date to ISO format (chỉ ngày tháng năm, không có thứ)
+    
+    Returns (iso_str, datetime); datetime is None when the string can't be parsed
+    and iso_str is then the cleaned input.
+    """
     if not date_str:
-        return ""
+        return "", None
     
     # Remove day of week (Thứ 2, Thứ 3, ..., Chủ nhật, etc.)
-    date_str = re.sub(r'(Thứ\s+\d+|Chủ\s+nhật|Monday|Tuesday|Wednesday|Thursday|Friday|Saturday|Sunday)[,\s]*', '', date_str, flags=re.IGNORECASE)
-    date_str = re.sub(r'\s+', ' ', date_str.strip())
-    
-    formats = [
-        "%d/%m/%Y, %H:%M",
-        "%d/%m/%Y %H:%M",
-        "%Y-%m-%d %H:%M:%S",
-        "%d/%m/%Y",
-        "%d-%m-%Y",
-        "%H:%M %d/%m/%Y",
-        "%H:%M, %d/%m/%Y",
-        "%H:%M - %d/%m/%Y",
-        "%d/%m/%Y - %H:%M",
-    ]
-    
-    for fmt in formats:
-        try:
-            dt = datetime.strptime(date_str, fmt)
-            return dt.strftime("%Y-%m-%d %H:%M:%S")
-        except:
-            continue
-    
-    return date_str
-
-def is_date_in_range(date_str):
-    """Check if date is within START_DATE and END_DATE"""
-    if not date_str:
-        return True  # Keep if can't determine date
+    lowered = date_str.lower()
+    if any(marker in lowered for marker in DAY_OF_WEEK_MARKERS):
+        date_str = DAY_OF_WEEK_RE.sub('', date_str)
+    date_str = ' '.join(date_str.split())
+    
+    # One pass: d/m/Y or d-m-Y with an optional leading or trailing H:M, or ISO Y-m-d H:M:S
+    m = ISO_DATETIME_RE.search(date_str)
+    if m:
+        year, month, day, hour, minute, second = map(int, m.groups())
+    else:
+        m = DMY_DATE_RE.search(date_str)
+        if not m:
+            return date_str, None
+        lead_hour, lead_minute, day, _, month, year, trail_hour, trail_minute = m.groups()
+        hour, minute = (lead_hour, lead_minute) if lead_hour else (trail_hour or 0, trail_minute or 0)
+        year, month, day, hour, minute, second = int(year), int(month), int(day), int(hour), int(minute), 0
     
     try:
-        # Try to parse the date
-        parsed = parse_date(date_str)
-        if not parsed or len(parsed) < 10:
-            return True
-        
-        date_part = parsed[:10]
-        article_date = datetime.strptime(date_part, "%Y-%m-%d")
-        
-        return START_DATE <= article_date <= END_DATE
-    except:
-        return True  # Keep if can't parse
+        dt = datetime(year, month, day, hour, minute, second)
+    except ValueError:
+        return date_str, None
+    return dt.strftime("%Y-%m-%d %H:%M:%S"), dt
+
+def is_date_in_range(dt):
+    """Check if a parsed date is within START_DATE and END_DATE (unknown dates are kept)"""
+    if dt is None:
+        return True
+    return START_DATE.date() <= dt.date() <= END_DATE.date()
+
+MAX_CONTENT_CHARS = 20000  # Stop collecting paragraphs once an article is this long
+
+def join_paragraphs(paragraphs):
+    """Join paragraph texts longer than 20 chars, stopping after MAX_CONTENT_CHARS"""
+    parts = []
+    total_len = 0
+    for p in paragraphs:
+        text = p.text(strip=True)
+        if len(text) > 20:
+            parts.append(text)
+            total_len += len(text) + 1
+            if total_len > MAX_CONTENT_CHARS:
+                break
+    return " ".join(parts)
 
 # ============= VNEXPRESS CRAWLER =============
+# Search results link to articles on the main site; urljoin resolves relative and // hrefs
+VNEXPRESS_ARTICLE_PREFIX = "https://vnexpress.net/"
+
 class VnExpressCrawler:
     BASE_URL = "https://vnexpress.net"
     # URL đúng: date_format=all, fromdate=0, todate=0
     SEARCH_URL = "https://timkiem.vnexpress.net/?q={query}&media_type=text&fromdate=0&todate=0&latest=&cate_code=&search_f=title,tag_list&date_format=all&page={page}"
     
     @staticmethod
-    def get_all_article_links(keyword, max_pages=1000):
-        """
-        Crawl TẤT CẢ article links cho keyword (all time)
-        """
-        links = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        
-        print(f"\n  🔍 Keyword: '{keyword}'", file=sys.stderr)
+    def listing_url(keyword, page):
+        return VnExpressCrawler.SEARCH_URL.format(
+            query=keyword.replace(' ', '+'),
+            page=page
+        )
+    
+    @staticmethod
+    def parse_listing(html):
+        """Return (page has results, article links) for one search page"""
+        hrefs = [_decode_href(m) for m in VNEXPRESS_LINK_RE.findall(html)]
+        has_results = bool(hrefs)
+        if not hrefs:
+            soup = BeautifulSoup(html, "lxml", parse_only=VNEXPRESS_LISTING_STRAINER)
+            articles = soup.find_all('h3', class_='title-news')
+            a_tags = (article.find('a', href=True) for article in articles)
+            hrefs = [a_tag.get('href', '') for a_tag in a_tags if a_tag]
+            has_results = bool(articles)
         
-        consecutive_empty = 0
-        for page in range(1, max_pages + 1):
-            if consecutive_empty >= 5:
-                print(f"    ⚠️  Stopped at page {page-1} (no more results)", file=sys.stderr)
-                break
-            
-            url = VnExpressCrawler.SEARCH_URL.format(
-                query=keyword.replace(' ', '+'),
-                page=page
-            )
-            
-            try:
-                resp = requests.get(url, headers=headers, timeout=45)
-                if resp.status_code != 200:
-                    consecutive_empty += 1
-                    time.sleep(1)
-                    continue
-                
-                soup = BeautifulSoup(resp.text, "html.parser")
-                articles = soup.find_all('h3', class_='title-news')
-                
-                if not articles:
-                    consecutive_empty += 1
-                    continue
-                
-                consecutive_empty = 0
-                page_links = 0
-                
-                for article in articles:
-                    a_tag = article.find('a', href=True)
-                    if a_tag:
-                        href = a_tag.get('href', '')
-                        if href.startswith('http'):
-                            links.append(('vnexpress', href))
-                            page_links += 1
-                        elif href.startswith('/'):
-                            links.append(('vnexpress', VnExpressCrawler.BASE_URL + href))
-                            page_links += 1
-                
-                if page % 20 == 0:  # Progress every 20 pages
-                    print(f"    📄 Page {page}: {page_links} links | Total: {len(links)}", file=sys.stderr)
-                
-                time.sleep(REQUEST_DELAY)
-                
-            except Exception as e:
-                print(f"    ⚠️  Error page {page}: {e}", file=sys.stderr)
-                consecutive_empty += 1
-                time.sleep(1)
+        urls = [urljoin(VNEXPRESS_ARTICLE_PREFIX, href) for href in hrefs]
+        links = [('vnexpress', url) for url in urls if url.startswith(VNEXPRESS_ARTICLE_PREFIX)]
         
-        print(f"    ✅ Total: {len(links)} links from {page-1} pages", file=sys.stderr)
-        return links
+        return has_results, links
     
     @staticmethod
-    def extract_content(url):
-        """Extract title, content, date from VnExpress article"""
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
+    def parse_article(html):
+        """Extract title, content, date from VnExpress article HTML"""
         
         try:
-            resp = requests.get(url, headers=headers, timeout=45)
-            if resp.status_code != 200:
-                return None, None, None
-            
-            soup = BeautifulSoup(resp.text, "html.parser")
+            tree = LexborHTMLParser(html)
             
             # Title
             title = ""
-            title_elem = soup.select_one("h1.title-detail")
+            title_elem = tree.css_first("h1.title-detail")
             if title_elem:
-                title = title_elem.get_text(strip=True)
+                title = title_elem.text(strip=True)
             
             # Content
             content = ""
-            content_elem = soup.select_one("article.fck_detail")
+            content_elem = tree.css_first("article.fck_detail")
             if content_elem:
-                paragraphs = content_elem.select("p.Normal")
-                if paragraphs:
-                    content = " ".join([p.get_text(strip=True) for p in paragraphs if len(p.get_text(strip=True)) > 20])
+                content = join_paragraphs(content_elem.css("p.Normal"))
             
             # Date
             date_str = ""
-            date_elem = soup.select_one("span.date")
+            date_elem = tree.css_first("span.date")
             if date_elem:
-                date_str = date_elem.get_text(strip=True)
+                date_str = date_elem.text(strip=True)
             
             return title, content, date_str
             
@@ -290,100 +367,54 @@ class DanTriCrawler:
     SEARCH_URL = "https://dantri.com.vn/tim-kiem/{query}.htm?page={page}"
     
     @staticmethod
-    def get_all_article_links(keyword, max_pages=500):
-        """
-        Crawl TẤT CẢ article links cho keyword từ Dân Trí (all time)
-        """
-        links = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        
-        print(f"\n  🔍 Keyword: '{keyword}'", file=sys.stderr)
-        
+    def listing_url(keyword, page):
         # Replace spaces with hyphens for URL
-        query_formatted = keyword.replace(' ', '-')
+        return DanTriCrawler.SEARCH_URL.format(
+            query=keyword.replace(' ', '-'),
+            page=page
+        )
+    
+    @staticmethod
+    def parse_listing(html):
+        """Return (page has results, article links) for one search page"""
+        soup = BeautifulSoup(html, "lxml", parse_only=DANTRI_LISTING_STRAINER)
+        articles = DANTRI_LINK_SELECTOR.select(soup)
         
-        consecutive_empty = 0
-        for page in range(1, max_pages + 1):
-            if consecutive_empty >= 5:
-                print(f"    ⚠️  Stopped at page {page-1} (no more results)", file=sys.stderr)
-                break
-            
-            url = DanTriCrawler.SEARCH_URL.format(
-                query=query_formatted,
-                page=page
-            )
-            
-            try:
-                resp = requests.get(url, headers=headers, timeout=45)
-                if resp.status_code != 200:
-                    consecutive_empty += 1
-                    time.sleep(1)
-                    continue
-                
-                soup = BeautifulSoup(resp.text, "html.parser")
-                articles = soup.select("h3.article-title a, h4.article-title a, a.article-title")
-                
-                if not articles:
-                    consecutive_empty += 1
-                    continue
-                
-                consecutive_empty = 0
-                page_links = 0
-                
-                for article in articles:
-                    href = article.get('href', '')
-                    if href:
-                        if href.startswith('http'):
-                            links.append(('dantri', href))
-                            page_links += 1
-                        elif href.startswith('/'):
-                            links.append(('dantri', DanTriCrawler.BASE_URL + href))
-                            page_links += 1
-                
-                if page % 20 == 0:  # Progress every 20 pages
-                    print(f"    📄 Page {page}: {page_links} links | Total: {len(links)}", file=sys.stderr)
-                
-                time.sleep(REQUEST_DELAY)
-                
-            except Exception as e:
-                print(f"    ⚠️  Error page {page}: {e}", file=sys.stderr)
-                consecutive_empty += 1
-                time.sleep(1)
+        links = []
+        for article in articles:
+            href = article.get('href', '')
+            if href:
+                if href.startswith('http'):
+                    links.append(('dantri', href))
+                elif href.startswith('/'):
+                    links.append(('dantri', DanTriCrawler.BASE_URL + href))
         
-        print(f"    ✅ Total: {len(links)} links from {page-1} pages", file=sys.stderr)
-        return links
+        return bool(articles), links
     
     @staticmethod
-    def extract_content(url):
-        """Extract title, content, date from Dân Trí article"""
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
+    def parse_article(html):
+        """Extract title, content, date from Dân Trí article HTML"""
         
         try:
-            resp = requests.get(url, headers=headers, timeout=45)
-            if resp.status_code != 200:
-                return None, None, None
-            
-            soup = BeautifulSoup(resp.text, "html.parser")
+            tree = LexborHTMLParser(html)
             
             # Title
             title = ""
-            title_elem = soup.select_one("h1.title-page, h1.article-title, h1.dt-news__title")
+            title_elem = tree.css_first("h1.title-page, h1.article-title, h1.dt-news__title")
             if title_elem:
-                title = title_elem.get_text(strip=True)
+                title = title_elem.text(strip=True)
             
             # Content
             content = ""
-            content_elem = soup.select_one("div.singular-content, div.article-content, div.dt-news__content")
+            content_elem = tree.css_first("div.singular-content, div.article-content, div.dt-news__content")
             if content_elem:
-                paragraphs = content_elem.select("p")
-                if paragraphs:
-                    content = " ".join([p.get_text(strip=True) for p in paragraphs if len(p.get_text(strip=True)) > 20])
+                content = join_paragraphs(content_elem.css("p"))
             
             # Date
             date_str = ""
-            date_elem = soup.select_one("time.author-time, span.author-time, time, span.dt-news__time")
+            date_elem = tree.css_first("time.author-time, span.author-time, time, span.dt-news__time")
             if date_elem:
-                date_str = date_elem.get_text(strip=True)
+                date_str = date_elem.text(strip=True)
             
             return title, content, date_str
             
@@ -396,184 +427,345 @@ class CafeFCrawler:
     SEARCH_URL = "https://cafef.vn/tim-kiem.chn?keywords={query}&page={page}"
     
     @staticmethod
-    def get_all_article_links(keyword, max_pages=500):
-        """
-        Crawl TẤT CẢ article links cho keyword từ CafeF (all time)
-        """
-        links = []
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'}
-        
-        print(f"\n  🔍 Keyword: '{keyword}'", file=sys.stderr)
+    def listing_url(keyword, page):
+        return CafeFCrawler.SEARCH_URL.format(
+            query=keyword.replace(' ', '+'),
+            page=page
+        )
+    
+    @staticmethod
+    def parse_listing(html):
+        """Return (page has results, article links) for one search page"""
+        hrefs = [_decode_href(m) for m in CAFEF_LINK_RE.findall(html)]
+        if not hrefs:
+            soup = BeautifulSoup(html, "lxml", parse_only=CAFEF_LISTING_STRAINER)
+            hrefs = [a.get('href', '') for a in soup.find_all('a', href=True)]
         
-        consecutive_empty = 0
-        for page in range(1, max_pages + 1):
-            if consecutive_empty >= 5:
-                print(f"    ⚠️  Stopped at page {page-1} (no more results)", file=sys.stderr)
-                break
-            
-            url = CafeFCrawler.SEARCH_URL.format(
-                query=keyword.replace(' ', '+'),
-                page=page
-            )
-            
-            try:
-                resp = requests.get(url, headers=headers, timeout=45)
-                if resp.status_code != 200:
-                    consecutive_empty += 1
-                    time.sleep(1)
-                    continue
-                
-                soup = BeautifulSoup(resp.text, "html.parser")
-                all_links = soup.find_all('a', href=True)
-                
-                found_articles = False
-                for a in all_links:
-                    href = a.get('href', '')
-                    
-                    # Check if link contains news article pattern
-                    if '.chn' in href:
-                        found_articles = True
-                        if not href.startswith('http'):
-                            href = CafeFCrawler.BASE_URL + href
-                        links.append(('cafef', href))
-                
-                if not found_articles:
-                    consecutive_empty += 1
-                else:
-                    consecutive_empty = 0
-                
-                if page % 20 == 0:  # Progress every 20 pages
-                    print(f"    📄 Page {page}: found links | Total: {len(links)}", file=sys.stderr)
-                
-                time.sleep(REQUEST_DELAY)
-                
-            except Exception as e:
-                print(f"    ⚠️  Error page {page}: {e}", file=sys.stderr)
-                consecutive_empty += 1
-                time.sleep(1)
+        links = []
+        for href in hrefs:
+            # Check if link contains news article pattern
+            if '.chn' in href:
+                links.append(('cafef', urljoin(CafeFCrawler.BASE_URL, href)))
         
-        print(f"    ✅ Total: {len(links)} links from {page-1} pages", file=sys.stderr)
-        return links
+        return bool(links), links
     
     @staticmethod
-    def extract_content(url):
-        """Extract title, content, date from CafeF article"""
-        headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)'}
+    def parse_article(html):
+        """Extract title, content, date from CafeF article HTML"""
         
         try:
-            resp = requests.get(url, headers=headers, timeout=45)
-            if resp.status_code != 200:
-                return None, None, None
-            
-            soup = BeautifulSoup(resp.text, "html.parser")
+            tree = LexborHTMLParser(html)
             
             # Title
             title = ""
-            title_elem = soup.select_one(".title-detail, h1, h1.title")
+            title_elem = tree.css_first(".title-detail, h1, h1.title")
             if title_elem:
-                title = title_elem.get_text(strip=True)
+                title = title_elem.text(strip=True)
             
             # Content
             content = ""
-            content_elem = soup.select_one(".detail-content, .main-content, #mainContent")
+            content_elem = tree.css_first(".detail-content, .main-content, #mainContent")
             if content_elem:
-                paragraphs = content_elem.select("p")
-                if paragraphs:
-                    content = " ".join([p.get_text(strip=True) for p in paragraphs if len(p.get_text(strip=True)) > 20])
+                content = join_paragraphs(content_elem.css("p"))
             
             # Date
             date_str = ""
-            date_elem = soup.select_one(".date, time, span.time")
+            date_elem = tree.css_first(".date, time, span.time")
             if date_elem:
-                date_str = date_elem.get_text(strip=True)
+                date_str = date_elem.text(strip=True)
             
             return title, content, date_str
             
         except Exception as e:
             return None, None, None
 
+# ============= RATE LIMITING =============
+class RateLimiter:
+    """Async token bucket: refills `rate` tokens/s, bursts up to `rate` requests"""
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+    
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+async def rate_limited_get(client, limiter, url):
+    await limiter.acquire()
+    return await client.get(url)
+
+# ============= LISTING CRAWLER =============
+# Pagination widget markers: a page that shows the widget but no next link is the last one
+PAGINATION_RE = re.compile(rb'class="[^"]*\b(?:button-page|pagination)\b')
+NEXT_PAGE_RE = re.compile(rb'rel="next"|class="[^"]*\bnext[-_]page\b')
+
+def is_last_page(html):
+    """True only when the page has pagination without a next link (unknown layouts keep paging)"""
+    return PAGINATION_RE.search(html) is not None and NEXT_PAGE_RE.search(html) is None
+
+async def get_all_article_links(client, limiter, crawler, keyword, max_pages=300):
+    """
+    Crawl TẤT CẢ article links cho keyword từ một nguồn (all time)
+    
+    Pages are fetched LISTING_WINDOW at a time; crawling stops at the first page without
+    a next link, or after 5 consecutive empty pages (applied in page order).
+    """
+    links = []
+    source = crawler.__name__.replace('Crawler', '')
+    loop = asyncio.get_running_loop()
+    
+    print(f"\n  🔍 {source} keyword: '{keyword}'", file=sys.stderr)
+    
+    consecutive_empty = 0
+    last_page = 0
+    for window_start in range(1, max_pages + 1, LISTING_WINDOW):
+        pages = range(window_start, min(window_start + LISTING_WINDOW, max_pages + 1))
+        responses = await asyncio.gather(
+            *(rate_limited_get(client, limiter, crawler.listing_url(keyword, page)) for page in pages),
+            return_exceptions=True
+        )
+        
+        had_error = False
+        reached_last = False
+        for page, resp in zip(pages, responses):
+            if consecutive_empty >= 5:
+                break
+            last_page = page
+            
+            if isinstance(resp, Exception):
+                print(f"    ⚠️  Error page {page}: {resp}", file=sys.stderr)
+                consecutive_empty += 1
+                had_error = True
+                continue
+            if resp.status_code != 200:
+                consecutive_empty += 1
+                had_error = True
+                continue
+            
+            has_results, page_links = await loop.run_in_executor(None, crawler.parse_listing, resp.content)
+            if not has_results:
+                consecutive_empty += 1
+                continue
+            
+            consecutive_empty = 0
+            links.extend(page_links)
+            if is_last_page(resp.content):
+                reached_last = True
+                break
+            
+            if page % 20 == 0:  # Progress every 20 pages
+                print(f"    📄 {source} page {page}: {len(page_links)} links | Total: {len(links)}", file=sys.stderr)
+        
+        if reached_last or consecutive_empty >= 5:
+            print(f"    ⚠️  {source}: stopped at page {last_page} (no more results)", file=sys.stderr)
+            break
+        
+        if had_error:
+            await asyncio.sleep(1)
+    
+    print(f"    ✅ {source}: {len(links)} links from {last_page} pages", file=sys.stderr)
+    return links
+
+# ============= SITEMAP DISCOVERY =============
+ROBOTS_SITEMAP_RE = re.compile(rb'^\s*sitemap:\s*(\S+)', re.IGNORECASE | re.MULTILINE)
+SITEMAP_LOC_RE = re.compile(rb'<loc>\s*(?:<!\[CDATA\[)?\s*([^<\]\s]+)')
+SITEMAP_YEAR_RE = re.compile(r'(?<!\d)(20\d\d)(?!\d)')
+
+def _sitemap_in_range(url):
+    """A dated sitemap file is only worth fetching if its year is in the crawl range"""
+    years = [int(y) for y in SITEMAP_YEAR_RE.findall(url)]
+    return not years or any(START_DATE.year <= y <= END_DATE.year for y in years)
+
+async def discover_sitemap_links(client, limiter):
+    """
+    Collect VnExpress article URLs from robots.txt -> sitemap index -> section sitemaps
+    
+    Only sitemaps under SITEMAP_SECTIONS (and their dated children in range) are read;
+    per-article dates are still checked after parsing.
+    """
+    print(f"\n  🗺️  VnExpress sitemap discovery: {VNEXPRESS_ROBOTS_URL}", file=sys.stderr)
+    try:
+        resp = await rate_limited_get(client, limiter, VNEXPRESS_ROBOTS_URL)
+    except Exception as e:
+        print(f"    ⚠️  robots.txt error: {e}", file=sys.stderr)
+        return []
+    if resp.status_code != 200:
+        return []
+    
+    links = []
+    seen_sitemaps = set()
+    # (sitemap url, already inside a wanted section)
+    pending = [(url, any(section in url for section in SITEMAP_SECTIONS))
+               for url in map(_decode_href, ROBOTS_SITEMAP_RE.findall(resp.content))]
+    while pending:
+        pending = [(url, in_section) for url, in_section in pending if url not in seen_sitemaps]
+        seen_sitemaps.update(url for url, _ in pending)
+        responses = await asyncio.gather(
+            *(rate_limited_get(client, limiter, url) for url, _ in pending),
+            return_exceptions=True
+        )
+        
+        next_pending = []
+        for (url, in_section), resp in zip(pending, responses):
+            if isinstance(resp, Exception) or resp.status_code != 200:
+                continue
+            body = resp.content
+            if body[:2] == b'\x1f\x8b':
+                body = gzip.decompress(body)
+            locs = [_decode_href(loc) for loc in SITEMAP_LOC_RE.findall(body)]
+            
+            if b'<sitemapindex' in body:
+                for loc in locs:
+                    child_in_section = in_section or any(section in loc for section in SITEMAP_SECTIONS)
+                    if child_in_section and _sitemap_in_range(loc):
+                        next_pending.append((loc, True))
+            elif in_section:
+                links.extend(('vnexpress', loc) for loc in locs if loc.startswith(VNEXPRESS_ARTICLE_PREFIX))
+        pending = next_pending
+    
+    print(f"    ✅ VnExpress sitemaps: {len(links)} links from {len(seen_sitemaps)} sitemaps", file=sys.stderr)
+    return links
+
+def dedupe_links(links):
+    """Drop repeated URLs, keyed by 64-bit xxh3 hashes (first occurrence wins)"""
+    seen = set()
+    unique = []
+    for source, url in links:
+        key = xxhash.xxh3_64_intdigest(url.encode())
+        if key not in seen:
+            seen.add(key)
+            unique.append((source, url))
+    return unique
+
 # ============= ARTICLE PROCESSING =============
-def process_article(source, url):
-    """Process single article"""
-    global total_articles_found, total_articles_with_tickers
+ARTICLE_PARSERS = {
+    'vnexpress': VnExpressCrawler.parse_article,
+    'dantri': DanTriCrawler.parse_article,
+    'cafef': CafeFCrawler.parse_article,
+}
+
+def create_async_client():
+    """Shared async HTTP client for listing and article pages (one connection pool per host)"""
+    return httpx.AsyncClient(
+        headers=HTTP_HEADERS,
+        timeout=45,
+        follow_redirects=True,
+        http2=True,
+        limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+        transport=create_cache_transport(httpx.AsyncHTTPTransport(retries=2, http2=True))
+    )
+
+async def fetch_article(client, semaphore, limiter, url):
+    """Download article HTML as raw bytes, None on error or non-200 response"""
+    async with semaphore:
+        try:
+            resp = await rate_limited_get(client, limiter, url)
+        except Exception:
+            return None
     
-    if url in seen_urls:
+    if resp.status_code != 200:
+        return None
+    return resp.content
+
+async def fetch_and_process_article(client, semaphores, limiters, parse_pool, source, url):
+    """Download an article, then parse it in the process pool"""
+    if source not in ARTICLE_PARSERS:
         return None
     
-    seen_urls.add(url)
+    html = await fetch_article(client, semaphores[source], limiters[source], url)
+    if html is None:
+        return None
     
-    # Extract content based on source
-    if source == 'vnexpress':
-        title, content, date_str = VnExpressCrawler.extract_content(url)
-    elif source == 'dantri':
-        title, content, date_str = DanTriCrawler.extract_content(url)
-    elif source == 'cafef':
-        title, content, date_str = CafeFCrawler.extract_content(url)
-    else:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(parse_pool, process_article, source, url, html)
+
+def process_article(source, url, html):
+    """Parse single article and apply the content/date filters (runs in a parse worker process)"""
+    
+    # Skip the parse for pages that cannot mention a target ticker
+    if not TICKER_PREFILTER_RE.search(html):
         return None
     
+    # Extract content based on source
+    title, content, date_str = ARTICLE_PARSERS[source](html)
+    
     # Validate
     if not content or len(content) < 100:
         return None
     
     # Check date range
-    if not is_date_in_range(date_str):
+    parsed_date, article_dt = parse_date_once(date_str)
+    if not is_date_in_range(article_dt):
         return None
     
-    with stats_lock:
-        total_articles_found += 1
-    
-    # Check if mentions FPT, BID, or BIDV
-    full_text = f"{title} {content}"
-    has_ticker, matched_tickers = contains_target_ticker(full_text)
-    
-    if not has_ticker:
-        return None
-    
-    with stats_lock:
-        total_articles_with_tickers += 1
-    
-    # Parse date
-    parsed_date = parse_date(date_str)
-    
-    if not title:
-        title = content[:50] + "..."
-    
-    tickers_str = ",".join(matched_tickers)
-    print(f"[FOUND] ✅ {tickers_str} | {parsed_date} | {title[:60]}...", file=sys.stderr)
-    
+    # Counting and ticker filtering happen on the event loop (see filter_ticker_articles)
     return {
         "date": parsed_date,
         "title": title,
         "content": content,
-        "tickers": tickers_str,
         "source": f"{source}:{url}"
     }
 
-def save_batch_to_csv(batch, output_file):
-    """Save batch to CSV (thread-safe)"""
-    with csv_lock:
-        file_exists = os.path.exists(output_file)
+def filter_ticker_articles(articles):
+    """Keep the articles that mention FPT, BID, or BIDV (one scan for the whole batch)"""
+    records = []
+    matches = match_tickers_batch([f"{a['title']} {a['content']}" for a in articles])
+    for article, matched_tickers in zip(articles, matches):
+        if not matched_tickers:
+            continue
         
-        with open(output_file, 'a', encoding="utf-8", newline="") as f:
-            writer = csv.DictWriter(f, fieldnames=["date", "title", "content", "tickers", "source"])
-            if not file_exists:
-                writer.writeheader()
-            for row in batch:
-                writer.writerow(row)
+        title = article["title"] or article["content"][:50] + "..."
+        tickers_str = ",".join(matched_tickers)
+        print(f"[FOUND] ✅ {tickers_str} | {article['date']} | {title[:60]}...", file=sys.stderr)
+        
+        records.append({
+            "date": article["date"],
+            "title": title,
+            "content": article["content"],
+            "tickers": tickers_str,
+            "source": article["source"]
+        })
+    
+    return records
+
+def save_batch_to_csv(batch, writer):
+    """Save batch to the open CSV writer (single writer: the event loop thread)"""
+    writer.writerows([tuple(row[field] for field in CSV_FIELDS) for row in batch])
 
 # ============= MAIN CRAWLER =============
 current_batch = []
 
 def crawl_vnexpress_all_time(output_file):
     """Main crawler - cào TẤT CẢ từ VnExpress"""
-    global current_batch
+    # Keep the CSV open for the whole crawl and stream rows into it
+    with open(output_file, 'w', encoding="utf-8", newline="", buffering=1 << 20) as f, \
+            ProcessPoolExecutor(max_workers=PARSE_WORKERS) as parse_pool:
+        writer = csv.writer(f)
+        writer.writerow(CSV_FIELDS)
+        try:
+            return asyncio.run(crawl_all_keywords(output_file, writer, parse_pool))
+        except KeyboardInterrupt:
+            # Flush the partial batch before the file is closed
+            if current_batch:
+                save_batch_to_csv(current_batch, writer)
+                print(f"[SAVE] 💾 Saved {len(current_batch)} records before exit", file=sys.stderr)
+            raise
+
+async def crawl_all_keywords(output_file, writer, parse_pool):
+    """Crawl every keyword on one event loop, sharing a single async HTTP client"""
+    global current_batch, total_articles_found, total_articles_with_tickers
     batch = []
     current_batch = batch
     
-    if os.path.exists(output_file):
-        os.remove(output_file)
-    
     total_records = 0
     
     print("\n" + "="*80, file=sys.stderr)
@@ -587,68 +779,83 @@ def crawl_vnexpress_all_time(output_file):
     print("="*80, file=sys.stderr)
     
     # Crawl by KEYWORD
-    for keyword in SEARCH_KEYWORDS:
-        print(f"\n{'='*80}", file=sys.stderr)
-        print(f"🔍 CRAWLING KEYWORD: '{keyword}'", file=sys.stderr)
-        print(f"{'='*80}", file=sys.stderr)
-        
-        # Get all links from VnExpress
-        print(f"\n📰 Source: VNEXPRESS", file=sys.stderr)
-        vnexpress_links = VnExpressCrawler.get_all_article_links(keyword, max_pages=300)
-        
-        # Get all links from Dân Trí
-        print(f"\n📰 Source: DÂN TRÍ", file=sys.stderr)
-        dantri_links = DanTriCrawler.get_all_article_links(keyword, max_pages=300)
-        dantri_links = []
-        
-        # Get all links from CafeF
-        print(f"\n📰 Source: CAFEF", file=sys.stderr)
-        cafef_links = CafeFCrawler.get_all_article_links(keyword, max_pages=300)
-
-        # Combine all links
-        links = vnexpress_links + dantri_links + cafef_links
-        
-        if not links:
-            print(f"  ⚠️  No links found for '{keyword}'", file=sys.stderr)
-            continue
-        
-        print(f"\n  📊 Total links: {len(links)} (VnExpress: {len(vnexpress_links)}, CafeF: {len(cafef_links)})", file=sys.stderr)
-        
-        # Process articles
-        print(f"\n  🔄 Processing {len(links)} articles...", file=sys.stderr)
+    loop = asyncio.get_running_loop()
+    semaphores = {source: asyncio.Semaphore(MAX_WORKERS) for source in ARTICLE_PARSERS}
+    limiters = {source: RateLimiter(REQUESTS_PER_SECOND) for source in ARTICLE_PARSERS}
+    async with create_async_client() as client:
+        sitemap_links = await discover_sitemap_links(client, limiters['vnexpress']) if USE_SITEMAPS else []
         
-        processed = 0
-        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
-            futures = {
-                executor.submit(process_article, source, url): (source, url) 
+        for keyword in SEARCH_KEYWORDS:
+            print(f"\n{'='*80}", file=sys.stderr)
+            print(f"🔍 CRAWLING KEYWORD: '{keyword}'", file=sys.stderr)
+            print(f"{'='*80}", file=sys.stderr)
+            
+            # Get all links from VnExpress, Dân Trí and CafeF concurrently
+            # (with sitemap links, VnExpress search is skipped; seen_urls drops them after the first keyword)
+            vnexpress_search = (asyncio.sleep(0, result=sitemap_links) if sitemap_links else
+                                get_all_article_links(client, limiters['vnexpress'], VnExpressCrawler, keyword, max_pages=300))
+            vnexpress_links, dantri_links, cafef_links = await asyncio.gather(
+                vnexpress_search,
+                get_all_article_links(client, limiters['dantri'], DanTriCrawler, keyword, max_pages=300),
+                get_all_article_links(client, limiters['cafef'], CafeFCrawler, keyword, max_pages=300),
+            )
+            dantri_links = []
+            
+            # Combine all links, dropping duplicates and URLs already queued for earlier keywords
+            links = vnexpress_links + dantri_links + cafef_links
+            links = [(source, url) for source, url in dedupe_links(links) if url not in seen_urls]
+            for _, url in links:
+                seen_urls.add(url)
+            
+            if not links:
+                print(f"  ⚠️  No links found for '{keyword}'", file=sys.stderr)
+                continue
+            
+            print(f"\n  📊 Total links: {len(links)} (VnExpress: {len(vnexpress_links)}, CafeF: {len(cafef_links)})", file=sys.stderr)
+            
+            # Process articles
+            print(f"\n  🔄 Processing {len(links)} articles...", file=sys.stderr)
+            
+            processed = 0
+            candidates = []
+            tasks = [
+                asyncio.create_task(fetch_and_process_article(client, semaphores, limiters, parse_pool, source, url))
                 for source, url in links
-            }
+            ]
             
-            for future in as_completed(futures):
+            for i, task in enumerate(asyncio.as_completed(tasks), 1):
                 try:
-                    result = future.result()
-                    if result:
+                    article = await task
+                    if article:
+                        candidates.append(article)
+                        total_articles_found += 1
+                    processed += 1
+                    if processed % 500 == 0:
+                        print(f"  📊 Processed: {processed}/{len(links)}, Found: {total_records}", file=sys.stderr)
+                except Exception as e:
+                    pass
+                
+                # Ticker-filter parsed articles in batches, off the event loop
+                if len(candidates) >= MATCH_BATCH_SIZE or (i == len(tasks) and candidates):
+                    results = await loop.run_in_executor(None, filter_ticker_articles, candidates)
+                    candidates = []
+                    total_articles_with_tickers += len(results)
+                    
+                    for result in results:
                         batch.append(result)
                         total_records += 1
                         
                         if len(batch) >= BATCH_SIZE:
-                            save_batch_to_csv(batch, output_file)
+                            save_batch_to_csv(batch, writer)
                             print(f"  [SAVE] 💾 Saved {len(batch)} records. Total: {total_records}", file=sys.stderr)
                             batch = []
                             current_batch = batch
-                    
-                    processed += 1
-                    if processed % 500 == 0:
-                        print(f"  📊 Processed: {processed}/{len(links)}, Found: {total_records}", file=sys.stderr)
-                        
-                except Exception as e:
-                    pass
+            
+            print(f"\n  ✅ Keyword '{keyword}' done: {total_records} articles saved", file=sys.stderr)
         
-        print(f"\n  ✅ Keyword '{keyword}' done: {total_records} articles saved", file=sys.stderr)
-    
     # Save final batch
     if batch:
-        save_batch_to_csv(batch, output_file)
+        save_batch_to_csv(batch, writer)
         print(f"\n[SAVE] 💾 Saved final {len(batch)} records", file=sys.stderr)
     
     return total_records
@@ -715,9 +922,6 @@ if __name__ == "__main__":
         
     except KeyboardInterrupt:
         print("\n[INFO] ⚠️  Interrupted by user")
-        if current_batch:
-            save_batch_to_csv(current_batch, output_file)
-            print(f"[SAVE] 💾 Saved {len(current_batch)} records before exit")
     except Exception as e:
         print(f"\n[ERROR] ❌ {e}", file=sys.stderr)
         import traceback
@@ -4,22 +4,69 @@
 # git clone https://huggingface.co/danhtran2mind/viet-news-sum-mt5-small-finetune
 
 import os
+# One OpenMP thread per physical core (set before torch so oneDNN picks it up)
+os.environ.setdefault("OMP_NUM_THREADS", str(max(1, (os.cpu_count() or 2) // 2)))
 import torch
 from transformers import T5ForConditionalGeneration, T5Tokenizer
 from transformers import AutoTokenizer, AutoModelForSequenceClassification
 
+device = "cuda" if torch.cuda.is_available() else "cpu"
+
+# Half precision on GPU; mT5 overflows in fp16, so the summarizer only drops to bf16
+if device == "cuda":
+    summary_dtype = torch.bfloat16 if torch.cuda.is_bf16_supported() else torch.float32
+    sentiment_dtype = torch.float16
+else:
+    summary_dtype = sentiment_dtype = torch.float32
+
 model_summary_name = "danhtran2mind/viet-news-sum-mt5-small-finetune"
 tokenizer_summary = T5Tokenizer.from_pretrained(model_summary_name)  
-model_summary = T5ForConditionalGeneration.from_pretrained(model_summary_name)
+model_summary = T5ForConditionalGeneration.from_pretrained(model_summary_name, torch_dtype=summary_dtype).to(device).eval()
 
 model_sentiment_name = "mr4/phobert-base-vi-sentiment-analysis"
 tokenizer_sentiment = AutoTokenizer.from_pretrained(model_sentiment_name)
-model_sentiment = AutoModelForSequenceClassification.from_pretrained(model_sentiment_name)
+model_sentiment = AutoModelForSequenceClassification.from_pretrained(model_sentiment_name, torch_dtype=sentiment_dtype).to(device).eval()
+if device == "cpu":
+    # INT8 dynamic quantization of every Linear (VNNI kernels); LayerNorm/embeddings stay fp32
+    model_sentiment = torch.quantization.quantize_dynamic(model_sentiment, {torch.nn.Linear}, dtype=torch.qint8)
+# Fuse the encoder ops; dynamic shapes because batches are padded to their own length
+model_sentiment = torch.compile(model_sentiment, mode="reduce-overhead" if device == "cuda" else "default", dynamic=True)
+
+BATCH_SIZE = 32
 
-def preprocess_input(text):
-    inputs = tokenizer_summary(text, max_length=512, truncation=True, padding="max_length", return_tensors="pt")
+def preprocess_input(texts):
+    # Pad to the longest text in the batch, not to 512, so encoder cost follows real length
+    inputs = tokenizer_summary(texts, max_length=512, truncation=True, padding=True, return_tensors="pt")
     return inputs
 
+def generate_summaries(texts, batch_size=BATCH_SIZE):
+    """
+        Generate summaries for many texts, one generate() call per batch.
+        
+        Args:
+            texts (list[str]): Input texts to summarize
+            batch_size (int): Number of texts per forward pass
+            
+        Returns:
+            list[str]: Generated summary for each text, in input order
+        """
+    summaries = []
+    for start in range(0, len(texts), batch_size):
+        batch = [text.replace("\n", "") for text in texts[start:start + batch_size]]
+        inputs = preprocess_input(batch).to(device)
+        
+        with torch.inference_mode():
+            summary_ids = model_summary.generate(
+                inputs["input_ids"],
+                attention_mask=inputs["attention_mask"],
+                max_length=128, 
+                num_beams=1,
+                do_sample=False,
+                use_cache=True
+            )
+        summaries.extend(tokenizer_summary.batch_decode(summary_ids, skip_special_tokens=True))
+    return summaries
+
 def generate_summary(text):
     """
         Generate a summary of the given text using T5 model.
@@ -30,17 +77,30 @@ def generate_summary(text):
         Returns:
             str: Generated summary text
         """
-    inputs = preprocess_input(text.replace("\n", ""))
+    return generate_summaries([text])[0]
+
+def analyze_sentiments(texts, batch_size=BATCH_SIZE):
+    """
+        Analyze sentiment of many texts, one forward pass per batch.
+        
+        Args:
+            texts (list[str]): Input texts to analyze sentiment
+            batch_size (int): Number of texts per forward pass
+            
+        Returns:
+            list[dict]: Sentiment labels and their scores for each text, in input order
+        """
+    id2label = model_sentiment.config.id2label
+    labels = [id2label[j] for j in range(len(id2label))]
     
-    with torch.no_grad():
-        summary_ids = model_summary.generate(
-            inputs["input_ids"],
-            attention_mask=inputs["attention_mask"],
-            max_length=128, 
-            early_stopping=True
-        )
-    summary = tokenizer_summary.decode(summary_ids[0], skip_special_tokens=True)
-    return summary
+    sentiment_results = []
+    for start in range(0, len(texts), batch_size):
+        inputs = tokenizer_sentiment(texts[start:start + batch_size], padding=True, truncation=True, return_tensors="pt").to(device)
+        with torch.inference_mode():
+            outputs = model_sentiment(**inputs)
+        predictions = torch.nn.functional.softmax(outputs.logits.float(), dim=-1).tolist()
+        sentiment_results.extend(dict(zip(labels, prediction)) for prediction in predictions)
+    return sentiment_results
 
 def analyze_sentiment(text):
     """
@@ -52,14 +112,11 @@ def analyze_sentiment(text):
         Returns:
             dict: Dictionary containing sentiment labels and their corresponding scores
         """
-    inputs = tokenizer_sentiment(text, padding=True, truncation=True, return_tensors="pt")
-    outputs = model_sentiment(**inputs)
-    predictions = torch.nn.functional.softmax(outputs.logits, dim=-1)
-    sentiment_results = {}
-    for i, prediction in enumerate(predictions):
-        for j, value in enumerate(prediction):
-            sentiment_results[model_sentiment.config.id2label[j]] = value.item()
-    return sentiment_results
+    return analyze_sentiments([text])[0]
+
+# Warm up both models so the first real call doesn't pay compilation / lazy-init latency
+generate_summaries(["Thị trường chứng khoán hôm nay tăng điểm nhờ nhóm cổ phiếu ngân hàng."])
+analyze_sentiments(["Thị trường chứng khoán hôm nay tăng điểm."])
 
 input_text = """Chị Thanh, gửi tiền tại Ngân hàng ACB chi nhánh An Lạc, quận Bình Tân (TP HCM), bình thường vẫn có thể rút tiền tại bất kỳ chi nhánh nào của ACB. Sáng nay cần tiền gấp, chị đã vào chi nhánh ACB Điện Biên Phủ để rút, song nhân viên tại đây thông báo hệ thống mạng gặp sự cố. Tạm thời ngân hàng chỉ giải quyết giao dịch cho những khách hàng đã gửi tiền tại chính chi nhánh này. Anh Minh Quang cho hay sáng nay anh chọn Ngân hàng Á Châu để gửi số tiền tiết kiệm, nhưng thấy hệ thống bị trục trặc nên đành ôm tiền về. "Thôi đành để hôm khác", anh nói. Trao đổi vớiVnExpress, ông Nguyễn Thanh Toại, Phó Tổng giám đốc Ngân hàng ACB thừa nhận sự cố mạng có xảy ra trong buổi sáng và cho hay, nguyên nhân do máy chủ gặp trục trặc. "Sáng nay khi khởi động, hệ thống mạng vẫn chạy bình thường. Song ít phút sau thì máy tính báo lỗi, các giao dịch online không thể thực hiện được. Hệ thống ATM cũng bị tê liệt hoàn toàn", ông Toại nói. Để ứng phó tạm thời, ngân hàng chỉ có thể giải quyết giao dịch cho những khách hàng rút tiền tại chính nơi mở tài khoản. Theo ông Toại, sự cố này khiến giao dịch của ACB giảm đi, song thiệt hại không nhiều. Phó Tổng giám đốc ACB cho biết thêm, trước đây, sự cố hệ thống mạng tương tự cũng đã xảy ra nhưng đều được khắc phục khá nhanh. Đây là lần xảy ra lâu nhất. Đến 10h30, nhân viên giao dịch các chi nhánh bắt đầu nhận chi trả cho khách nộp tiền tại chỗ. Những khách hàng khác thuộc dạng "vãng lai" đều được hẹn lại vào buổi chiều. Sáng nay, khách đến giao dịch tại Công ty chứng khoán ACBS trực thuộc ngân hàng Á Châu cũng gặp khó khăn trong những giao dịch liên quan đến tài khoản như việc kiểm tra số dư, rút và nộp tiền vào tài khoản. "Đối với những lệnh bán chứng khoán vẫn thực hiện bình thường, nhưng lệnh mua của khách hàng đã được ACBS chuyển thẳng lên nhân viên nhập lệnh tại Sở Giao dịch qua đường điện thoại", một nhân viên tại đây cho biết."""
 summary = generate_summary(input_text)
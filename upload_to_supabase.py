@@ -3,10 +3,17 @@ Script để thiết kế schema và upload dữ liệu lên Supabase
 """
 
 import os
+import time
+import itertools
+import httpx
 import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+import orjson
 from supabase import create_client, Client
 from dotenv import load_dotenv
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+from tqdm import tqdm
 
 # Load environment variables
 load_dotenv()
@@ -18,6 +25,35 @@ SUPABASE_KEY = os.getenv('SUPABASE_PUBLISHABLE_KEY')
 # Khởi tạo Supabase client
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
+# Số batch gửi song song (upload bị giới hạn bởi độ trễ mạng, không phải CPU)
+UPLOAD_WORKERS = 8
+
+# Số lần gửi lại một batch khi server lỗi 5xx hoặc mạng timeout, và thời gian chờ ban đầu (giây, nhân đôi mỗi lần)
+UPLOAD_RETRIES = 3
+UPLOAD_RETRY_BACKOFF = 1.0
+
+# Kích thước mỗi block PyArrow đọc từ CSV (bytes)
+CSV_BLOCK_SIZE = 4 << 20
+
+# Kiểu cột khi đọc CSV bằng PyArrow (cột text giữ nguyên chuỗi, không tự suy ra ngày)
+STOCK_CSV_TYPES = {
+    'time': pa.string(),
+    'open': pa.float64(),
+    'high': pa.float64(),
+    'low': pa.float64(),
+    'close': pa.float64(),
+    'volume': pa.float64(),
+    'symbol': pa.string()
+}
+NEWS_CSV_TYPES = {
+    'date': pa.string(),
+    'year': pa.float64(),
+    'ticker': pa.string(),
+    'title': pa.string(),
+    'content': pa.string(),
+    'source': pa.string()
+}
+
 def create_stock_data_table():
     """
     Tạo bảng stock_data với schema phù hợp
@@ -117,6 +153,135 @@ def create_news_data_table():
     print("\n✓ Vui lòng chạy SQL này trong Supabase SQL Editor\n")
     return schema_sql
 
+STOCK_COLUMNS = ['time', 'open', 'high', 'low', 'close', 'volume', 'ticker']
+NEWS_COLUMNS = ['date', 'year', 'ticker', 'title', 'content', 'source']
+NEWS_NULLABLE_COLUMNS = ['date', 'year', 'content', 'source']
+
+def build_stock_records(df: pd.DataFrame):
+    """
+    Chuyển DataFrame stock sang list dict (ép kiểu theo cột, không lặp từng dòng)
+    """
+    df = df.rename(columns={'symbol': 'ticker'})  # Map 'symbol' từ CSV sang 'ticker' trong database
+    df['volume'] = df['volume'].fillna(0).astype('int64')
+    df[['open', 'high', 'low', 'close']] = df[['open', 'high', 'low', 'close']].astype('float64')
+    return df[STOCK_COLUMNS].to_dict(orient='records')
+
+def build_news_records(df: pd.DataFrame):
+    """
+    Chuyển DataFrame news sang list dict, giá trị thiếu thành None
+    """
+    missing = df[NEWS_NULLABLE_COLUMNS].isna()
+    df = df[NEWS_COLUMNS].astype({
+        'date': str,
+        'year': 'Int64',
+        'ticker': str,
+        'title': str,
+        'content': str,
+        'source': str
+    }).astype(object)
+    df[NEWS_NULLABLE_COLUMNS] = df[NEWS_NULLABLE_COLUMNS].mask(missing, None)
+    return df.to_dict(orient='records')
+
+def _upsert_batch(table_name: str, batch: list, on_conflict: str):
+    """
+    Upsert một batch vào bảng, bỏ qua các dòng trùng khóa unique
+    Gửi thẳng qua session HTTP của PostgREST client (cùng URL + headers xác thực) với
+    payload encode bằng orjson thay vì json của stdlib; server không cần trả lại các dòng
+    Lỗi 5xx / timeout / mất kết nối được thử lại tối đa UPLOAD_RETRIES lần (backoff tăng dần)
+    """
+    params = {'on_conflict': on_conflict, 'columns': ','.join(f'"{c}"' for c in batch[0])}
+    payload = orjson.dumps(batch)
+    for attempt in range(1, UPLOAD_RETRIES + 1):
+        try:
+            response = supabase.postgrest.session.post(
+                table_name,
+                params=params,
+                headers={
+                    'Prefer': 'return=minimal,resolution=ignore-duplicates',
+                    'Content-Type': 'application/json'
+                },
+                content=payload
+            )
+            response.raise_for_status()
+            return len(batch)
+        except (httpx.HTTPStatusError, httpx.TransportError) as e:
+            retryable = not isinstance(e, httpx.HTTPStatusError) or e.response.status_code >= 500
+            if not retryable or attempt == UPLOAD_RETRIES:
+                raise
+            reason = e.response.status_code if isinstance(e, httpx.HTTPStatusError) else type(e).__name__
+            delay = UPLOAD_RETRY_BACKOFF * 2 ** (attempt - 1)
+            print(f"\n⚠️  Upload batch vào {table_name} lỗi ({reason}) ở lần {attempt}/{UPLOAD_RETRIES}, "
+                  f"thử lại sau {delay:.0f}s...")
+            time.sleep(delay)
+
+def _collect_uploaded(futures, pbar):
+    """
+    Lấy kết quả các batch đã xong, cập nhật progress bar
+    """
+    uploaded = 0
+    for future in futures:
+        count = future.result()
+        uploaded += count
+        pbar.update(count)
+    return uploaded
+
+def read_csv_chunks(csv_path: str, column_types: dict):
+    """
+    Đọc CSV từng block bằng PyArrow (parser C++ nhanh hơn pandas), trả về từng DataFrame
+    """
+    reader = pacsv.open_csv(
+        csv_path,
+        read_options=pacsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),
+        convert_options=pacsv.ConvertOptions(
+            include_columns=list(column_types),
+            column_types=column_types,
+            strings_can_be_null=True
+        )
+    )
+    for batch in reader:
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+def upload_csv(csv_path: str, table_name: str, build_records, column_types: dict, batch_size: int,
+               on_conflict: str, max_workers: int = UPLOAD_WORKERS):
+    """
+    Đọc CSV theo block và upload ngay từng block, gửi song song nhiều batch cùng lúc
+    Bộ nhớ chỉ giữ vài block thay vì toàn bộ file + list records
+    Dòng trùng (theo on_conflict) được server bỏ qua nên chạy lại script không lỗi
+    Trả về (số dòng đã đọc, số records đã gửi)
+    """
+    print(f"📖 Đang đọc file: {csv_path}")
+    total_rows = 0
+    total_uploaded = 0
+    pending = set()
+    
+    chunks = read_csv_chunks(csv_path, column_types)
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        return total_rows, total_uploaded
+    
+    print(f"\nCột trong dataset: {list(first_chunk.columns)}")
+    print(f"\nMẫu dữ liệu:\n{first_chunk.head()}\n")
+    print(f"\n🚀 Bắt đầu upload (batch {batch_size} records, {max_workers} luồng)...\n")
+    
+    with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+            tqdm(desc=f"Upload {table_name}", unit="records") as pbar:
+        for df in itertools.chain([first_chunk], chunks):
+            total_rows += len(df)
+            records = build_records(df)
+            for i in range(0, len(records), batch_size):
+                pending.add(executor.submit(_upsert_batch, table_name, records[i:i + batch_size], on_conflict))
+            
+            # Chờ bớt batch đang gửi trước khi đọc block tiếp theo
+            while len(pending) > max_workers:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                total_uploaded += _collect_uploaded(done, pbar)
+        
+        total_uploaded += _collect_uploaded(as_completed(pending), pbar)
+    
+    return total_rows, total_uploaded
+
 def upload_stock_data(csv_path: str, batch_size: int = 1000):
     """
     Upload dữ liệu stock từ CSV lên Supabase
@@ -125,49 +290,13 @@ def upload_stock_data(csv_path: str, batch_size: int = 1000):
     print(f"UPLOADING STOCK DATA")
     print(f"{'=' * 60}\n")
     
-    # Đọc CSV
-    print(f"📖 Đang đọc file: {csv_path}")
-    df = pd.read_csv(csv_path)
-    
-    print(f"✓ Đã đọc {len(df)} dòng dữ liệu")
-    print(f"\nCột trong dataset: {list(df.columns)}")
-    print(f"\nMẫu dữ liệu:\n{df.head()}\n")
-    
-    # Chuẩn bị dữ liệu
-    records = []
-    for _, row in df.iterrows():
-        record = {
-            'time': row['time'],
-            'open': float(row['open']),
-            'high': float(row['high']),
-            'low': float(row['low']),
-            'close': float(row['close']),
-            'volume': int(row['volume']) if pd.notna(row['volume']) else 0,
-            'ticker': row['symbol']  # Map 'symbol' từ CSV sang 'ticker' trong database
-        }
-        records.append(record)
-    
-    # Upload theo batch
-    total_uploaded = 0
-    total_batches = (len(records) + batch_size - 1) // batch_size
-    
-    print(f"\n🚀 Bắt đầu upload {len(records)} records (chia thành {total_batches} batches)...\n")
-    
-    for i in range(0, len(records), batch_size):
-        batch = records[i:i + batch_size]
-        batch_num = (i // batch_size) + 1
-        
-        try:
-            response = supabase.table('stock_data').insert(batch).execute()
-            total_uploaded += len(batch)
-            print(f"✓ Batch {batch_num}/{total_batches}: Đã upload {len(batch)} records (Tổng: {total_uploaded}/{len(records)})")
-        except Exception as e:
-            print(f"✗ Lỗi tại batch {batch_num}: {str(e)}")
-            # Tiếp tục với batch tiếp theo
-            continue
+    # Đọc CSV theo block và upload theo batch
+    total_rows, total_uploaded = upload_csv(csv_path, 'stock_data', build_stock_records, STOCK_CSV_TYPES,
+                                            batch_size, on_conflict='time,ticker')
     
+    print(f"\n✓ Đã đọc {total_rows} dòng dữ liệu")
     print(f"\n{'=' * 60}")
-    print(f"✅ Hoàn thành! Đã upload {total_uploaded}/{len(records)} records")
+    print(f"✅ Hoàn thành! Đã upload {total_uploaded}/{total_rows} records")
     print(f"{'=' * 60}\n")
 
 def upload_news_data(csv_path: str, batch_size: int = 500):
@@ -178,48 +307,13 @@ def upload_news_data(csv_path: str, batch_size: int = 500):
     print(f"UPLOADING NEWS DATA")
     print(f"{'=' * 60}\n")
     
-    # Đọc CSV
-    print(f"📖 Đang đọc file: {csv_path}")
-    df = pd.read_csv(csv_path)
-    
-    print(f"✓ Đã đọc {len(df)} dòng dữ liệu")
-    print(f"\nCột trong dataset: {list(df.columns)}")
-    print(f"\nMẫu dữ liệu:\n{df.head()}\n")
-    
-    # Chuẩn bị dữ liệu
-    records = []
-    for _, row in df.iterrows():
-        record = {
-            'date': str(row['date']) if pd.notna(row['date']) else None,
-            'year': int(row['year']) if pd.notna(row['year']) else None,
-            'ticker': str(row['ticker']),
-            'title': str(row['title']),
-            'content': str(row['content']) if pd.notna(row['content']) else None,
-            'source': str(row['source']) if pd.notna(row['source']) else None
-        }
-        records.append(record)
-    
-    # Upload theo batch
-    total_uploaded = 0
-    total_batches = (len(records) + batch_size - 1) // batch_size
-    
-    print(f"\n🚀 Bắt đầu upload {len(records)} records (chia thành {total_batches} batches)...\n")
-    
-    for i in range(0, len(records), batch_size):
-        batch = records[i:i + batch_size]
-        batch_num = (i // batch_size) + 1
-        
-        try:
-            response = supabase.table('news_data').insert(batch).execute()
-            total_uploaded += len(batch)
-            print(f"✓ Batch {batch_num}/{total_batches}: Đã upload {len(batch)} records (Tổng: {total_uploaded}/{len(records)})")
-        except Exception as e:
-            print(f"✗ Lỗi tại batch {batch_num}: {str(e)}")
-            # Tiếp tục với batch tiếp theo
-            continue
+    # Đọc CSV theo block và upload theo batch
+    total_rows, total_uploaded = upload_csv(csv_path, 'news_data', build_news_records, NEWS_CSV_TYPES,
+                                            batch_size, on_conflict='title,ticker,date')
     
+    print(f"\n✓ Đã đọc {total_rows} dòng dữ liệu")
     print(f"\n{'=' * 60}")
-    print(f"✅ Hoàn thành! Đã upload {total_uploaded}/{len(records)} records")
+    print(f"✅ Hoàn thành! Đã upload {total_uploaded}/{total_rows} records")
     print(f"{'=' * 60}\n")
 
 def main():